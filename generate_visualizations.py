@@ -10,14 +10,39 @@ Usage:
 
 import argparse
 import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+# <model>[_effort_<level>[_...]][_YYYYMMDD_HHMMSS]
+_DIR_NAME_RE = re.compile(
+    r"^(?P<name>.*?)"
+    r"(?:_effort_(?P<effort>[^_]*).*?)?"
+    r"(?:_(?P<date>[0-9]{8})_(?P<time>[0-9]{6}))?$",
+    re.DOTALL,
+)
+
+
+def _scandir_recursive(path: str):
+    """Yield benchmark_report.json paths under path, reusing cached DirEntry info."""
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_symlink():
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _scandir_recursive(entry.path)
+                elif entry.name == "benchmark_report.json":
+                    yield Path(entry.path)
+    except PermissionError:
+        return
 
 
 def scan_results_directory(root: Path) -> List[Path]:
     """Find all benchmark_report.json files recursively."""
-    return sorted(root.glob("**/benchmark_report.json"))
+    return sorted(_scandir_recursive(root))
 
 
 def extract_model_label(dir_name: str) -> str:
@@ -31,25 +56,14 @@ def extract_model_label(dir_name: str) -> str:
         openai_claude-4-6-opus
         → "OpenAI Claude-4-6-Opus"
     """
-    # Try to extract timestamp if present
+    m = _DIR_NAME_RE.match(dir_name)
+    dir_name = m.group('name')
+    effort_match = m.group('effort')
     timestamp_match = None
-    parts = dir_name.rsplit('_', 2)
-    if len(parts) == 3 and len(parts[-2]) == 8 and len(parts[-1]) == 6:
+    date = m.group('date')
+    if date:
         # Has timestamp: YYYYMMDD_HHMMSS
-        timestamp_str = parts[-2]
-        try:
-            date = datetime.strptime(timestamp_str, '%Y%m%d')
-            timestamp_match = date.strftime('%Y-%m-%d')
-            dir_name = '_'.join(parts[:-2])
-        except ValueError:
-            pass
-
-    # Extract effort level if present
-    effort_match = None
-    if '_effort_' in dir_name:
-        parts = dir_name.split('_effort_')
-        dir_name = parts[0]
-        effort_match = parts[1].split('_')[0] if len(parts) > 1 else None
+        timestamp_match = f"{date[:4]}-{date[4:6]}-{date[6:]}"
 
     # Format model name: replace underscores with spaces, title case
     model_name = dir_name.replace('_', ' ').title()
@@ -67,10 +81,21 @@ def extract_model_label(dir_name: str) -> str:
     return label_parts[0]
 
 
+def extract_timestamp(dir_name: str) -> int:
+    """
+    Return the YYYYMMDD_HHMMSS suffix of a directory name as a sortable int.
+
+    Directories without a timestamp sort as 0 (oldest).
+    """
+    m = _DIR_NAME_RE.match(dir_name)
+    if m.group('date'):
+        return int(m.group('date') + m.group('time'))
+    return 0
+
+
 def load_benchmark_report(path: Path) -> Dict[str, Any]:
     """Load a single benchmark report and add metadata."""
-    with open(path) as f:
-        data = json.load(f)
+    data = json.loads(path.read_bytes())
 
     # Add label extracted from directory name
     dir_name = path.parent.name
@@ -79,24 +104,44 @@ def load_benchmark_report(path: Path) -> Dict[str, Any]:
     return data
 
 
-def generate_html(reports: List[Dict[str, Any]], css_path: Path, js_path: Path) -> str:
-    """Generate self-contained HTML with embedded data, CSS, and JavaScript."""
+def _load_report_safe(path: Path) -> Tuple[Path, Optional[Dict[str, Any]], Optional[str]]:
+    """Worker wrapper: load a report, returning the error message instead of raising."""
+    try:
+        return path, load_benchmark_report(path), None
+    except Exception as e:
+        return path, None, str(e)
 
-    # Read CSS and JS files
-    css_content = css_path.read_text()
-    js_content = js_path.read_text()
 
-    # Embed benchmark data as JSON
-    benchmark_data = json.dumps(reports, indent=2)
+def load_benchmark_reports(
+    paths: List[Path],
+    jobs: int = 0,
+) -> List[Tuple[Path, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Load reports in input order, parsing them across worker processes.
 
-    html = f"""<!DOCTYPE html>
+    jobs=0 uses one worker per CPU; jobs=1 (or a single report) loads serially.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) <= 1:
+        return [_load_report_safe(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as ex:
+        return list(ex.map(_load_report_safe, paths, chunksize=8))
+
+
+# Compact output for the embedded data block. ASCII escaping stays on: a
+# lone surrogate in model output can't be encoded as UTF-8
+_DATA_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+_HTML_HEAD = b"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width, initial-scale=1.0">
   <title>AgentRE-Bench Results</title>
   <style>
-{css_content}
+"""
+
+_HTML_BODY_START = b"""
   </style>
 </head>
 <body>
@@ -122,7 +167,9 @@ def generate_html(reports: List[Dict[str, Any]], css_path: Path, js_path: Path)
 
   <!-- Embedded Benchmark Data -->
   <script id="benchmark-data" type="application/json">
-{benchmark_data}
+"""
+
+_HTML_SCRIPTS = b"""
   </script>
 
   <!-- Chart.js Library (from CDN) -->
@@ -130,12 +177,40 @@ def generate_html(reports: List[Dict[str, Any]], css_path: Path, js_path: Path)
 
   <!-- Application JavaScript -->
   <script>
-{js_content}
+"""
+
+_HTML_TAIL = b"""
   </script>
 </body>
 </html>"""
 
-    return html
+
+def write_html(
+    reports: List[Dict[str, Any]],
+    css_path: Path,
+    js_path: Path,
+    out_path: Path,
+) -> None:
+    """
+    Write self-contained HTML with embedded data, CSS, and JavaScript.
+
+    The benchmark data is serialized straight into the output file so the
+    full document is never held in memory as a single string.
+    """
+    # Read CSS and JS files (copied through as raw UTF-8 bytes)
+    css_content = css_path.read_bytes()
+    js_content = js_path.read_bytes()
+
+    with out_path.open("wb") as f:
+        f.write(_HTML_HEAD)
+        f.write(css_content)
+        f.write(_HTML_BODY_START)
+        # Embed benchmark data as compact JSON (the browser doesn't need whitespace)
+        for chunk in _DATA_ENCODER.iterencode(reports):
+            f.write(chunk.encode("utf-8"))
+        f.write(_HTML_SCRIPTS)
+        f.write(js_content)
+        f.write(_HTML_TAIL)
 
 
 def main():
@@ -175,6 +250,12 @@ Examples:
         default=0,
         help='Maximum number of models to include (0 = all, sorted by timestamp)'
     )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=0,
+        help='Worker processes for loading reports (0 = one per CPU, 1 = serial)'
+    )
     parser.add_argument(
         '--css',
         type=Path,
@@ -218,22 +299,24 @@ Examples:
 
     # Load reports
     print(f"\nLoading {len(all_report_paths)} benchmark reports...")
-    reports = []
-    for path in all_report_paths:
-        try:
-            report = load_benchmark_report(path)
-            reports.append(report)
+    # (directory timestamp, report); the sort key stays out of the
+    # report data embedded in the HTML
+    loaded = []
+    for path, report, error in load_benchmark_reports(all_report_paths, args.jobs):
+        if error is None:
+            loaded.append((extract_timestamp(path.parent.name), report))
             print(f"  ✓ {report['label']}")
-        except Exception as e:
-            print(f"  ✗ Failed to load {path}: {e}")
+        else:
+            print(f"  ✗ Failed to load {path}: {error}")
 
-    if not reports:
+    if not loaded:
         print("Error: Failed to load any benchmark reports")
         return 1
 
     # Sort by timestamp (newest first) if multiple reports
-    if len(reports) > 1:
-        reports.sort(key=lambda r: r.get('label', ''), reverse=True)
+    if len(loaded) > 1:
+        loaded.sort(key=lambda item: (item[0], item[1]['label']), reverse=True)
+    reports = [report for _, report in loaded]
 
     # Limit number of models if requested
     if args.max_models > 0 and len(reports) > args.max_models:
@@ -248,11 +331,8 @@ Examples:
 
     # Generate HTML
     print(f"\nGenerating HTML with {len(reports)} models...")
-    html_content = generate_html(reports, args.css, args.js)
-
-    # Write to file
-    output_path.write_text(html_content)
-    file_size_kb = len(html_content) / 1024
+    write_html(reports, args.css, args.js, output_path)
+    file_size_kb = output_path.stat().st_size / 1024
 
     print(f"\n✓ Generated: {output_path}")
     print(f"  File size: {file_size_kb:.1f} KB")
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import json
 import logging
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Any
 
 from .langfuse import NoopLangfuseClient
@@ -11,8 +14,122 @@ from .tools import ToolExecutor, get_tool_schemas_for_format
 
 log = logging.getLogger(__name__)
 
+# Budget warnings; {calls} is e.g. "2 tool calls"
+_BUDGET_WARNING_CRITICAL = (
+    "CRITICAL: You have only {calls} left. "
+    "You MUST call the final_answer tool NOW with your "
+    "best analysis. Do not use any more investigation tools."
+)
+_BUDGET_WARNING_WRAP_UP = (
+    "IMPORTANT: You have only {calls} remaining. "
+    "Start wrapping up your analysis and submit your "
+    "findings using the final_answer tool soon. "
+    "Submit your best answer with what you've found so far "
+    "rather than running out of tool calls."
+)
+
+_JSON_BLOCK_RE = re.compile(r"```json\s*(.*?)```", re.DOTALL)
+_CODE_BLOCK_RE = re.compile(r"```\s*(.*?)```", re.DOTALL)
+_INLINE_JSON_RE = re.compile(r"\{[^{}]*\"file_type\"[^{}]*\}", re.DOTALL)
+
+# Patterns for recovering a final answer from plain-text responses, tried in
+# order. Each is paired with a literal that must appear in the text for the
+# pattern to possibly match, so prose-only responses skip the regex scans.
+_JSON_PATTERNS = (
+    ("```", _JSON_BLOCK_RE),
+    ("```", _CODE_BLOCK_RE),
+    ('"file_type"', _INLINE_JSON_RE),
+)
+
+
+def _preview_args(args: Any, limit: int = 120) -> str:
+    """Build a short "key=value, ..." preview without serializing the whole input."""
+    if not isinstance(args, dict):
+        text = str(args)
+        return text[:limit] + "..." if len(text) > limit else text
+    parts = []
+    length = 0
+    for k, v in args.items():
+        part = f"{k}={str(v)[:40]}"
+        length += len(part) + 2
+        if length > limit:
+            parts.append("...")
+            break
+        parts.append(part)
+    return ", ".join(parts)
+
+
+def _freeze(obj: Any) -> Any:
+    """Convert a tool input into a hashable, order-independent key."""
+    if isinstance(obj, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(x) for x in obj)
+    try:
+        hash(obj)
+    except TypeError:
+        return str(obj)
+    return obj
+
+
+@dataclass(slots=True)
+class ToolCallLogEntry:
+    call_number: int
+    tool: str
+    input: dict
+    is_final_answer: bool = False
+    output_preview: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        entry: dict[str, Any] = {
+            "call_number": self.call_number,
+            "tool": self.tool,
+            "input": self.input,
+        }
+        if self.is_final_answer:
+            entry["is_final_answer"] = True
+        if self.output_preview is not None:
+            entry["output_preview"] = self.output_preview
+        return entry
+
 
 class AgentLoop:
+    __slots__ = (
+        "provider",
+        "tool_executor",
+        "system_prompt",
+        "task_id",
+        "file_type",
+        "max_tool_calls",
+        "max_tokens",
+        "verbose",
+        "show_progress",
+        "langfuse",
+        "langfuse_trace_id",
+        "_langfuse_capture_messages",
+        "parallel_tool_calls",
+        "max_tool_concurrency",
+        "_lf_active",
+        "_base_meta",
+        "messages",
+        "tool_call_count",
+        "tool_calls_log",
+        "tool_calls_by_type",
+        "redundant_tool_calls",
+        "_seen_call_keys",
+        "input_tokens",
+        "cache_read_input_tokens",
+        "cache_creation_input_tokens",
+        "output_tokens",
+        "invalid_tool_calls",
+        "invalid_json_attempts",
+        "_budget_warnings",
+        "error_occurred",
+        "error_type",
+        "error_message",
+        "http_status_code",
+    )
+
     def __init__(
         self,
         provider: AgentProvider,
@@ -25,6 +142,10 @@ class AgentLoop:
         verbose: bool = False,
         langfuse: Any = None,
         langfuse_trace_id: str | None = None,
+        langfuse_capture_messages: bool = False,
+        parallel_tool_calls: bool = True,
+        max_tool_concurrency: int = 4,
+        show_progress: bool = True,
     ):
         self.provider = provider
         self.tool_executor = tool_executor
@@ -34,16 +155,37 @@ class AgentLoop:
         self.max_tool_calls = max_tool_calls
         self.max_tokens = max_tokens
         self.verbose = verbose
+        self.show_progress = show_progress
         self.langfuse = langfuse or NoopLangfuseClient()
         self.langfuse_trace_id = langfuse_trace_id
+        # Attaching the full message history to every generation makes the
+        # traced payload grow quadratically with steps, so it is opt-in.
+        self._langfuse_capture_messages = langfuse_capture_messages
+        # With no live trace every langfuse call is a no-op, so skip building payloads
+        self._lf_active = bool(getattr(self.langfuse, "enabled", False) and langfuse_trace_id)
+        self._base_meta = {"task_id": task_id}
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_tool_concurrency = max_tool_concurrency
 
         self.messages: list[dict] = []
         self.tool_call_count = 0
-        self.tool_calls_log: list[dict] = []
+        self.tool_calls_log: list[ToolCallLogEntry] = []
+        self.tool_calls_by_type: dict[str, int] = {}
+        self.redundant_tool_calls = 0
+        self._seen_call_keys: set[tuple] = set()  # (tool, frozen input)
         self.input_tokens = 0
+        self.cache_read_input_tokens = 0
+        self.cache_creation_input_tokens = 0
         self.output_tokens = 0
         self.invalid_tool_calls = 0
         self.invalid_json_attempts = 0
+        # Pending budget warnings by remaining-call threshold, most urgent
+        # first; thresholds a run of this size can't meaningfully reach are omitted
+        self._budget_warnings: dict[int, str] = {
+            threshold: template
+            for threshold, template in ((2, _BUDGET_WARNING_CRITICAL), (5, _BUDGET_WARNING_WRAP_UP))
+            if max_tool_calls >= threshold
+        }
 
         # Error tracking
         self.error_occurred = False
@@ -51,6 +193,14 @@ class AgentLoop:
         self.error_message = ""
         self.http_status_code = 0
 
+    @property
+    def total_tokens(self) -> int:
+        """Every prompt token processed (cached or not) plus the output."""
+        return (
+            self.input_tokens + self.cache_read_input_tokens
+            + self.cache_creation_input_tokens + self.output_tokens
+        )
+
     def _vprint(self, *args, **kwargs):
         """Print only in verbose mode."""
         if self.verbose:
@@ -58,11 +208,22 @@ class AgentLoop:
 
     def _dot(self):
         """Print a progress dot in non-verbose mode."""
-        if not self.verbose:
+        if self.show_progress and not self.verbose:
             print(".", end="", flush=True)
 
+    def _execute_tool_calls(self, tool_calls: list) -> list[dict[str, Any]]:
+        """Execute one turn's tool calls, concurrently when enabled; results keep call order."""
+        workers = min(len(tool_calls), self.max_tool_concurrency)
+        if not self.parallel_tool_calls or workers < 2:
+            return [self.tool_executor.execute(tc.name, tc.input) for tc in tool_calls]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(
+                lambda tc: self.tool_executor.execute(tc.name, tc.input),
+                tool_calls,
+            ))
+
     def run(self) -> dict[str, Any]:
-        start_time = time.time()
+        start_time = time.monotonic()
         tools = get_tool_schemas_for_format(self.file_type, include_final_answer=True)
 
         # Initial user message
@@ -79,18 +240,23 @@ class AgentLoop:
         max_steps_hit = False
 
         while self.tool_call_count < self.max_tool_calls:
-            generation_id = self.langfuse.create_generation(
-                trace_id=self.langfuse_trace_id,
-                name="llm.create_message",
-                model=getattr(self.provider, "model", "unknown"),
-                input={
+            generation_id = None
+            if self._lf_active:
+                generation_input = {
                     "system": self.system_prompt,
-                    "messages": self.messages,
                     "tools": tools,
                     "max_tokens": self.max_tokens,
-                },
-                metadata={"task_id": self.task_id, "tool_call_count": self.tool_call_count},
-            )
+                }
+                if self._langfuse_capture_messages:
+                    # Snapshot: events are serialized later by the ingestion thread
+                    generation_input["messages"] = list(self.messages)
+                generation_id = self.langfuse.create_generation(
+                    trace_id=self.langfuse_trace_id,
+                    name="llm.create_message",
+                    model=getattr(self.provider, "model", "unknown"),
+                    input=generation_input,
+                    metadata={**self._base_meta, "tool_call_count": self.tool_call_count},
+                )
             try:
                 response = self.provider.create_message(
                     system=self.system_prompt,
@@ -108,7 +274,6 @@ class AgentLoop:
                 if "prompt is too long" in error_str or "context" in error_str.lower() and "maximum" in error_str.lower():
                     self.error_type = "context_overflow"
                     # Try to extract token count from error message
-                    import re
                     match = re.search(r"(\d+)\s*tokens?\s*>", error_str)
                     if match:
                         self.error_message = f"Context overflow: {match.group(1)} tokens"
@@ -123,62 +288,65 @@ class AgentLoop:
                 elif "HTTP" in error_str:
                     self.error_type = "http_error"
                     # Try to extract status code
-                    import re
                     match = re.search(r"HTTP\s*(\d{3})", error_str)
                     if match:
                         self.http_status_code = int(match.group(1))
                 else:
                     self.error_type = "other"
 
-                self.langfuse.end_generation(
-                    trace_id=self.langfuse_trace_id,
-                    generation_id=generation_id,
-                    output={"error": str(e)},
-                    level="ERROR",
-                    status_message="provider_error",
-                )
-                self.langfuse.create_event(
-                    trace_id=self.langfuse_trace_id,
-                    name="provider_error",
-                    output={"error": str(e)},
-                    metadata={"task_id": self.task_id},
-                    level="ERROR",
-                    parent_observation_id=generation_id,
-                )
+                if self._lf_active:
+                    self.langfuse.end_generation(
+                        trace_id=self.langfuse_trace_id,
+                        generation_id=generation_id,
+                        output={"error": str(e)},
+                        level="ERROR",
+                        status_message="provider_error",
+                    )
+                    self.langfuse.create_event(
+                        trace_id=self.langfuse_trace_id,
+                        name="provider_error",
+                        output={"error": str(e)},
+                        metadata=self._base_meta,
+                        level="ERROR",
+                        parent_observation_id=generation_id,
+                    )
                 log.error("[%s] Provider error: %s", self.task_id, e)
                 self._vprint(f"\n  !! Provider error: {e}")
                 break
 
-            self.langfuse.end_generation(
-                trace_id=self.langfuse_trace_id,
-                generation_id=generation_id,
-                output={
-                    "stop_reason": response.stop_reason,
-                    "text_content": response.text_content,
-                    "tool_calls": [
-                        {"id": tc.id, "name": tc.name, "input": tc.input}
-                        for tc in (response.tool_calls or [])
-                    ],
-                },
-                usage={
-                    "input": response.input_tokens,
-                    "output": response.output_tokens,
-                    "total": response.input_tokens + response.output_tokens,
-                    "unit": "TOKENS",
-                },
-                metadata={
-                    "task_id": self.task_id,
-                    "stop_reason": response.stop_reason,
-                    "tool_calls": len(response.tool_calls or []),
-                },
-            )
+            if self._lf_active:
+                self.langfuse.end_generation(
+                    trace_id=self.langfuse_trace_id,
+                    generation_id=generation_id,
+                    output={
+                        "stop_reason": response.stop_reason,
+                        "text_content": response.text_content,
+                        "tool_calls": [
+                            {"id": tc.id, "name": tc.name, "input": tc.input}
+                            for tc in (response.tool_calls or [])
+                        ],
+                    },
+                    usage={
+                        "input": response.input_tokens,
+                        "output": response.output_tokens,
+                        "total": response.total_tokens,
+                        "unit": "TOKENS",
+                    },
+                    metadata={
+                        **self._base_meta,
+                        "stop_reason": response.stop_reason,
+                        "tool_calls": len(response.tool_calls or []),
+                    },
+                )
 
             self.input_tokens += response.input_tokens
+            self.cache_read_input_tokens += response.cache_read_input_tokens
+            self.cache_creation_input_tokens += response.cache_creation_input_tokens
             self.output_tokens += response.output_tokens
 
             if response.stop_reason == "tool_use" and response.tool_calls:
                 # Show agent reasoning (verbose only)
-                if response.text_content:
+                if self.verbose and response.text_content:
                     self._vprint(f"\n  Agent:")
                     for line in response.text_content.strip().splitlines():
                         self._vprint(f"    {line}")
@@ -204,52 +372,70 @@ class AgentLoop:
 
                 self.messages.append({"role": "assistant", "content": assistant_content})
 
-                # Execute each tool call
+                # Calls after a final_answer in the same turn are never run
+                tool_calls = response.tool_calls
+                for i, tc in enumerate(tool_calls):
+                    if tc.name == "final_answer":
+                        tool_calls = tool_calls[:i + 1]
+                        break
+
+                # Open spans before executing so they cover the tool runtime
+                span_ids: list[str | None] = [None] * len(tool_calls)
+                if self._lf_active:
+                    for i, tc in enumerate(tool_calls):
+                        span_ids[i] = self.langfuse.create_span(
+                            trace_id=self.langfuse_trace_id,
+                            name=f"tool.{tc.name}",
+                            input=tc.input,
+                            metadata={
+                                **self._base_meta,
+                                "call_number": self.tool_call_count + i + 1,
+                                "tool": tc.name,
+                            },
+                        )
+
+                results = self._execute_tool_calls(tool_calls)
+
+                # Record each tool call in order
                 tool_results = []
-                for tc in response.tool_calls:
+                for tc, tool_span_id, result in zip(tool_calls, span_ids, results):
                     self.tool_call_count += 1
-                    self.tool_calls_log.append({
-                        "call_number": self.tool_call_count,
-                        "tool": tc.name,
-                        "input": tc.input,
-                    })
+                    self.tool_calls_log.append(ToolCallLogEntry(
+                        call_number=self.tool_call_count,
+                        tool=tc.name,
+                        input=tc.input,
+                    ))
+                    self.tool_calls_by_type[tc.name] = self.tool_calls_by_type.get(tc.name, 0) + 1
+                    call_key = (tc.name, _freeze(tc.input))
+                    if call_key in self._seen_call_keys:
+                        self.redundant_tool_calls += 1
+                    else:
+                        self._seen_call_keys.add(call_key)
 
                     # Verbose: show step and tool info
-                    args_str = json.dumps(tc.input, default=str)
-                    if len(args_str) > 120:
-                        args_str = args_str[:120] + "..."
-                    self._vprint(
-                        f"\n  [{self.tool_call_count}/{self.max_tool_calls}] "
-                        f"{tc.name}  {args_str}"
-                    )
+                    if self.verbose:
+                        self._vprint(
+                            f"\n  [{self.tool_call_count}/{self.max_tool_calls}] "
+                            f"{tc.name}  {_preview_args(tc.input)}"
+                        )
 
-                    tool_span_id = self.langfuse.create_span(
-                        trace_id=self.langfuse_trace_id,
-                        name=f"tool.{tc.name}",
-                        input=tc.input,
-                        metadata={
-                            "task_id": self.task_id,
-                            "call_number": self.tool_call_count,
-                            "tool": tc.name,
-                        },
-                    )
-                    result = self.tool_executor.execute(tc.name, tc.input)
 
                     if result.get("is_final_answer"):
                         final_answer = result["answer"]
-                        self.tool_calls_log[-1]["is_final_answer"] = True
-                        self.langfuse.end_span(
-                            trace_id=self.langfuse_trace_id,
-                            span_id=tool_span_id,
-                            output={"is_final_answer": True, "answer": final_answer},
-                        )
-                        self.langfuse.create_event(
-                            trace_id=self.langfuse_trace_id,
-                            name="final_answer_submitted",
-                            output=final_answer,
-                            metadata={"task_id": self.task_id, "tool": tc.name},
-                            parent_observation_id=tool_span_id,
-                        )
+                        self.tool_calls_log[-1].is_final_answer = True
+                        if self._lf_active:
+                            self.langfuse.end_span(
+                                trace_id=self.langfuse_trace_id,
+                                span_id=tool_span_id,
+                                output={"is_final_answer": True, "answer": final_answer},
+                            )
+                            self.langfuse.create_event(
+                                trace_id=self.langfuse_trace_id,
+                                name="final_answer_submitted",
+                                output=final_answer,
+                                metadata={**self._base_meta, "tool": tc.name},
+                                parent_observation_id=tool_span_id,
+                            )
                         self._vprint(f"\n  Final answer submitted")
                         self._dot()
                         break
@@ -260,35 +446,39 @@ class AgentLoop:
                     else:
                         output_text = result.get("output", "(no output)")
 
-                    self.tool_calls_log[-1]["output_preview"] = output_text[:500]
+                    self.tool_calls_log[-1].output_preview = output_text[:500]
 
-                    self.langfuse.end_span(
-                        trace_id=self.langfuse_trace_id,
-                        span_id=tool_span_id,
-                        output={
-                            "error": result.get("error"),
-                            "output": output_text,
-                        },
-                        metadata={
-                            "task_id": self.task_id,
-                            "call_number": self.tool_call_count,
-                            "output_chars": len(output_text),
-                            "had_error": bool(result.get("error")),
-                        },
-                        level="ERROR" if result.get("error") else None,
-                        status_message="tool_error" if result.get("error") else None,
-                    )
-
-                    # Verbose: show output preview
-                    self._vprint(f"    -> {len(output_text)} chars")
-                    preview_lines = output_text[:1500].splitlines()[:20]
-                    for line in preview_lines:
-                        self._vprint(f"       {line[:120]}")
-                    if len(output_text) > 1500 or len(output_text.splitlines()) > 20:
-                        self._vprint(f"       ... [truncated]")
+                    if self._lf_active:
+                        self.langfuse.end_span(
+                            trace_id=self.langfuse_trace_id,
+                            span_id=tool_span_id,
+                            output={
+                                "error": result.get("error"),
+                                "output": output_text,
+                            },
+                            metadata={
+                                **self._base_meta,
+                                "call_number": self.tool_call_count,
+                                "output_chars": len(output_text),
+                                "had_error": bool(result.get("error")),
+                            },
+                            level="ERROR" if result.get("error") else None,
+                            status_message="tool_error" if result.get("error") else None,
+                        )
 
-                    # Non-verbose: progress dot
-                    self._dot()
+                    if self.verbose:
+                        # Show output preview
+                        self._vprint(f"    -> {len(output_text)} chars")
+                        # Up to 1500 chars this is the full line split, so it also
+                        # decides truncation without a second pass over the output
+                        preview_lines = output_text[:1500].splitlines()
+                        for line in preview_lines[:20]:
+                            self._vprint(f"       {line[:120]}")
+                        if len(output_text) > 1500 or len(preview_lines) > 20:
+                            self._vprint(f"       ... [truncated]")
+                    else:
+                        # Non-verbose: progress dot
+                        self._dot()
 
                     tool_results.append({
                         "type": "tool_result",
@@ -302,36 +492,32 @@ class AgentLoop:
                 if tool_results:
                     self.messages.append({"role": "user", "content": tool_results})
 
-                    # Budget warnings
+                    # Budget warnings — each is sent at most once, even when a
+                    # multi-call turn skips past its exact threshold; sending one
+                    # also retires the less urgent ones
                     remaining = self.max_tool_calls - self.tool_call_count
-                    if remaining == 5:
+                    # At zero the loop ends before the model could read a warning
+                    threshold = None
+                    if remaining > 0:
+                        threshold = next((t for t in self._budget_warnings if remaining <= t), None)
+                    if threshold is not None:
+                        template = self._budget_warnings[threshold]
+                        self._budget_warnings = {
+                            t: m for t, m in self._budget_warnings.items() if t < threshold
+                        }
+                        calls = f"{remaining} tool call{'s' if remaining != 1 else ''}"
                         self.messages.append({
                             "role": "user",
-                            "content": (
-                                "IMPORTANT: You have only 5 tool calls remaining. "
-                                "Start wrapping up your analysis and submit your "
-                                "findings using the final_answer tool soon. "
-                                "Submit your best answer with what you've found so far "
-                                "rather than running out of tool calls."
-                            ),
+                            "content": template.format(calls=calls),
                         })
-                        self._vprint(f"\n  ** Budget warning: 5 calls left **")
-                    elif remaining == 2:
-                        self.messages.append({
-                            "role": "user",
-                            "content": (
-                                "CRITICAL: You have only 2 tool calls left. "
-                                "You MUST call the final_answer tool NOW with your "
-                                "best analysis. Do not use any more investigation tools."
-                            ),
-                        })
-                        self._vprint(f"\n  ** Budget warning: 2 calls left **")
+                        self._vprint(f"\n  ** Budget warning: {remaining} calls left **")
 
             elif response.stop_reason == "end_turn":
-                if response.text_content:
+                if self.verbose and response.text_content:
                     self._vprint(f"\n  Agent (no tool call):")
-                    for line in response.text_content.strip().splitlines()[:10]:
-                        self._vprint(f"    {line}")
+                    # Only 10 lines are shown; don't split the rest of the text
+                    for line in response.text_content.strip().split("\n", 10)[:10]:
+                        self._vprint(f"    {line.rstrip()}")
 
                 # Agent stopped without calling a tool — try to extract JSON
                 extracted = self._try_extract_json(response.text_content)
@@ -373,47 +559,39 @@ class AgentLoop:
 
         else:
             max_steps_hit = True
-            self.langfuse.create_event(
-                trace_id=self.langfuse_trace_id,
-                name="max_tool_calls_hit",
-                metadata={"task_id": self.task_id, "max_tool_calls": self.max_tool_calls},
-                level="WARNING",
-            )
+            if self._lf_active:
+                self.langfuse.create_event(
+                    trace_id=self.langfuse_trace_id,
+                    name="max_tool_calls_hit",
+                    metadata={**self._base_meta, "max_tool_calls": self.max_tool_calls},
+                    level="WARNING",
+                )
             self._vprint(f"\n  !! Hit max tool calls limit ({self.max_tool_calls})")
 
-        wall_time = time.time() - start_time
+        wall_time = time.monotonic() - start_time
 
-        self._vprint(
-            f"\n  Done: {self.tool_call_count} calls, "
-            f"{wall_time:.1f}s, "
-            f"{self.input_tokens + self.output_tokens:,} tokens"
-        )
-
-        # Compute tool usage stats
-        tool_calls_by_type: dict[str, int] = {}
-        seen_calls: set[str] = set()
-        redundant_tool_calls = 0
-        for entry in self.tool_calls_log:
-            name = entry["tool"]
-            tool_calls_by_type[name] = tool_calls_by_type.get(name, 0) + 1
-            call_key = f"{name}:{json.dumps(entry['input'], sort_keys=True, default=str)}"
-            if call_key in seen_calls:
-                redundant_tool_calls += 1
-            seen_calls.add(call_key)
+        if self.verbose:
+            self._vprint(
+                f"\n  Done: {self.tool_call_count} calls, "
+                f"{wall_time:.1f}s, "
+                f"{self.total_tokens:,} tokens"
+            )
 
         return {
             "task_id": self.task_id,
             "final_answer": final_answer,
             "transcript": self.messages,
             "tool_call_count": self.tool_call_count,
-            "tool_calls_by_type": tool_calls_by_type,
-            "tool_calls_log": self.tool_calls_log,
-            "redundant_tool_calls": redundant_tool_calls,
+            "tool_calls_by_type": self.tool_calls_by_type,
+            "tool_calls_log": [entry.to_dict() for entry in self.tool_calls_log],
+            "redundant_tool_calls": self.redundant_tool_calls,
             "invalid_tool_calls": self.invalid_tool_calls,
             "invalid_json_attempts": self.invalid_json_attempts,
             "input_tokens": self.input_tokens,
+            "cache_read_input_tokens": self.cache_read_input_tokens,
+            "cache_creation_input_tokens": self.cache_creation_input_tokens,
             "output_tokens": self.output_tokens,
-            "total_tokens": self.input_tokens + self.output_tokens,
+            "total_tokens": self.total_tokens,
             "wall_time_seconds": round(wall_time, 2),
             "max_steps_hit": max_steps_hit,
             "has_valid_answer": final_answer is not None,
@@ -428,14 +606,12 @@ class AgentLoop:
     def _try_extract_json(self, text: str) -> dict | None:
         if not text:
             return None
-        import re
-        patterns = [
-            r"```json\s*(.*?)```",
-            r"```\s*(.*?)```",
-            r"\{[^{}]*\"file_type\"[^{}]*\}",
-        ]
-        for pattern in patterns:
-            for match in re.finditer(pattern, text, re.DOTALL):
+        if "```" not in text and '"file_type"' not in text:
+            return None
+        for marker, pattern in _JSON_PATTERNS:
+            if marker not in text:
+                continue
+            for match in pattern.finditer(text):
                 try:
                     data = json.loads(match.group(1) if match.lastindex else match.group(0))
                     if isinstance(data, dict) and "file_type" in data:
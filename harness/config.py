@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import functools
 import os
+import stat
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -16,28 +18,43 @@ DEFAULT_TOOLS = [
     "file", "strings", "readelf", "objdump", "nm", "hexdump", "xxd", "entropy", "pefile",
 ]
 
+# Read-only tools whose output depends only on their input and the binary
+CACHEABLE_TOOLS = frozenset(DEFAULT_TOOLS)
 
-def _load_dotenv(project_root: Path) -> None:
-    """Load .env file from project root into os.environ (without overwriting)."""
-    env_path = project_root / ".env"
-    if not env_path.is_file():
-        return
-    with open(env_path) as f:
-        for line in f:
+
+@functools.lru_cache(maxsize=8)
+def _parse_dotenv_cached(path: str, mtime_ns: int) -> tuple[tuple[str, str], ...]:
+    """Parse a .env file; cached per (path, mtime) so edits are picked up."""
+    pairs = []
+    with open(path) as f:
+        for line in f.read().splitlines():
             line = line.strip()
             if not line or line.startswith("#"):
                 continue
-            if "=" not in line:
+            key, sep, value = line.partition("=")
+            if not sep:
                 continue
-            key, _, value = line.partition("=")
-            key = key.strip()
             value = value.strip()
             # Strip surrounding quotes
             if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
                 value = value[1:-1]
-            # Don't overwrite existing env vars (CLI/shell takes priority)
-            if key not in os.environ:
-                os.environ[key] = value
+            pairs.append((key.strip(), value))
+    return tuple(pairs)
+
+
+def _load_dotenv(project_root: Path) -> None:
+    """Load .env file from project root into os.environ (without overwriting)."""
+    env_path = project_root / ".env"
+    try:
+        st = env_path.stat()
+    except OSError:
+        return
+    if not stat.S_ISREG(st.st_mode):
+        return
+    for key, value in _parse_dotenv_cached(str(env_path), st.st_mtime_ns):
+        # Don't overwrite existing env vars (CLI/shell takes priority)
+        if key not in os.environ:
+            os.environ[key] = value
 
 
 @dataclass
@@ -54,14 +71,21 @@ class BenchmarkConfig:
     is_bedrock_anthropic: bool = False  # Enable Bedrock/Anthropic-compatible mode
 
     max_tool_calls: int = 25
+    max_parallel_tasks: int = 1  # >1 runs that many tasks concurrently
     tool_timeout_seconds: int = 30
     max_output_chars: int = 50000
     max_tokens: int = 4096
 
     docker_image: str = "agentre-bench-tools:latest"
     use_docker: bool = True
+    reuse_tool_container: bool = True  # docker exec into one container per task
 
     allowed_tools: list[str] = field(default_factory=lambda: list(DEFAULT_TOOLS))
+    enable_parallel_tool_execution: bool = True  # Run a turn's tool calls concurrently
+    max_tool_concurrency: int = 4
+    enable_tool_cache: bool = True
+    reuse_task_results: bool = False  # Replay scored results for unchanged tasks
+    tool_cache_dir: Path = field(default=None)  # default: <project_root>/results/tool_cache
 
     results_dir: Path = field(default=None)
     verbose: bool = False
@@ -69,6 +93,7 @@ class BenchmarkConfig:
     langfuse_secret_key: str = ""
     langfuse_host: str = "https://cloud.langfuse.com"
     langfuse_enabled: bool = False
+    langfuse_capture_messages: bool = False  # Attach full message history to generations
 
     def __post_init__(self):
         self.project_root = Path(self.project_root).resolve()
@@ -82,6 +107,11 @@ class BenchmarkConfig:
         else:
             self.results_dir = Path(self.results_dir).resolve()
 
+        if self.tool_cache_dir is None:
+            self.tool_cache_dir = self.project_root / "results" / "tool_cache"
+        else:
+            self.tool_cache_dir = Path(self.tool_cache_dir).resolve()
+
         # Load .env file so API keys are available via env vars
         _load_dotenv(self.project_root)
 
@@ -104,6 +134,10 @@ class BenchmarkConfig:
 
         self.langfuse_enabled = bool(self.langfuse_public_key and self.langfuse_secret_key)
 
+        if not self.langfuse_capture_messages:
+            capture_flag = os.environ.get("LANGFUSE_CAPTURE_MESSAGES", "").lower()
+            self.langfuse_capture_messages = capture_flag in ("true", "1", "yes")
+
     def resolve_api_key(self) -> str:
         # 1. Explicit --api-key flag (highest priority)
         if self.api_key:
@@ -127,3 +161,7 @@ class BenchmarkConfig:
     @property
     def transcripts_dir(self) -> Path:
         return self.results_dir / "transcripts"
+
+    @property
+    def task_cache_dir(self) -> Path:
+        return self.results_dir / "task_cache"
@@ -1,20 +1,84 @@
 from __future__ import annotations
 
+import atexit
 import base64
 import json
 import logging
+import os
+import queue
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
 from typing import Any
-import urllib.request
+
+from .providers.http_client import KeepAliveHTTPClient
 
 log = logging.getLogger(__name__)
 
+# json.dumps with keyword options builds a new encoder per call; reuse one
+_PAYLOAD_ENCODER = json.JSONEncoder(separators=(",", ":"), default=str)
+_TEXT_ENCODER = json.JSONEncoder(default=str)
+# The quoting/escaping _TEXT_ENCODER applies to every string (ensure_ascii)
+_escape_json_string = json.encoder.encode_basestring_ascii
+
+# Ingestion batching: POST once this many events are queued, or after the
+# first queued event has waited this long, whichever comes first.
+BATCH_MAX_EVENTS = 50
+BATCH_MAX_WAIT_SECONDS = 0.5
+
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+class _UUIDPool:
+    """Hand out random (version 4) UUID strings from one os.urandom call per batch."""
+
+    def __init__(self, size: int = 256):
+        self._size = size
+        self._buf = b""
+        self._pos = 0
+        self._lock = threading.Lock()
+
+    def next_uuid(self) -> str:
+        with self._lock:
+            if self._pos >= len(self._buf):
+                self._buf = os.urandom(16 * self._size)
+                self._pos = 0
+            raw = self._buf[self._pos:self._pos + 16]
+            self._pos += 16
+        # version=4 sets the RFC 4122 version and variant bits
+        return str(uuid.UUID(bytes=raw, version=4))
+
+
+def _approx_size(value: Any, depth: int = 0) -> int:
+    """Cheap upper bound on len(_TEXT_ENCODER.encode(value)).
+
+    Strings are measured with the encoder's own (C) escaping, since
+    newlines, quotes and non-ASCII can grow them up to twelvefold.
+    Deeply nested values report an effectively infinite size so the
+    caller falls back to measuring the real serialization.
+    """
+    if isinstance(value, str):
+        return len(_escape_json_string(value))
+    if isinstance(value, int) and not isinstance(value, bool):
+        # Digits, sign, and quotes when used as a dict key
+        return value.bit_length() // 3 + 4
+    if value is None or isinstance(value, (bool, float)):
+        return 26
+    if depth >= 8:
+        return 1 << 62
+    if isinstance(value, dict):
+        return 2 + sum(
+            _approx_size(k, depth + 1) + _approx_size(v, depth + 1) + 4
+            for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return 2 + sum(_approx_size(x, depth + 1) + 2 for x in value)
+    return len(_escape_json_string(str(value)))
+
+
 class NoopLangfuseClient:
     enabled = False
 
@@ -39,6 +103,9 @@ class NoopLangfuseClient:
     def create_event(self, trace_id: str | None, **kwargs) -> None:
         return None
 
+    def flush(self) -> None:
+        return None
+
 
 class LangfuseClient:
     enabled = True
@@ -49,41 +116,83 @@ class LangfuseClient:
         self.host = host.rstrip("/")
         token = base64.b64encode(f"{public_key}:{secret_key}".encode("utf-8")).decode("ascii")
         self._auth_header = f"Basic {token}"
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": self._auth_header,
+        }
         self._warned = False
+        self._uuid_pool = _UUIDPool()
+
+        # Keep-alive client of its own (the providers' one uses a longer
+        # timeout), so the TCP/TLS handshake is paid once rather than per
+        # POST; proxied hosts still go through urlopen.
+        self._ingestion_url = f"{self.host}/api/public/ingestion"
+        self._http = KeepAliveHTTPClient(timeout=15, max_idle_per_host=1)
+
+        # Events are queued by the caller and POSTed in batches by a daemon
+        # thread, so tracing never blocks the agent loop on network I/O.
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._drain_loop, name="langfuse-ingestion", daemon=True
+        )
+        self._worker.start()
+        atexit.register(self.flush)
 
     def _truncate(self, value: Any, max_chars: int = 12000) -> Any:
-        text = json.dumps(value, default=str) if isinstance(value, (dict, list, tuple)) else str(value)
+        # Most payloads are well under budget; only serialize to measure
+        # (and cut) when the estimate says the value might be too large.
+        if _approx_size(value) <= max_chars:
+            return value
+        text = _TEXT_ENCODER.encode(value) if isinstance(value, (dict, list, tuple)) else str(value)
         if len(text) <= max_chars:
             return value
         return text[:max_chars] + "... [truncated]"
 
     def _emit(self, event_type: str, body: dict[str, Any]) -> None:
+        self._queue.put({
+            "id": self._uuid_pool.next_uuid(),
+            "type": event_type,
+            "timestamp": _now_iso(),
+            "body": body,
+        })
+
+    def flush(self) -> None:
+        """Block until every queued event has been sent (or dropped on error)."""
+        self._queue.join()
+
+    def _drain_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + BATCH_MAX_WAIT_SECONDS
+            while len(batch) < BATCH_MAX_EVENTS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._post_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _post_batch(self, batch: list[dict[str, Any]]) -> None:
         payload = {
-            "batch": [
-                {
-                    "id": str(uuid.uuid4()),
-                    "type": event_type,
-                    "timestamp": _now_iso(),
-                    "body": body,
-                }
-            ],
+            "batch": batch,
             "metadata": {"sdk_integration": "agentre-bench-raw-http"},
         }
-        data = json.dumps(payload, default=str).encode("utf-8")
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": self._auth_header,
-        }
-        url = f"{self.host}/api/public/ingestion"
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
         try:
-            with urllib.request.urlopen(req, timeout=15):
-                pass
+            self._post(_PAYLOAD_ENCODER.encode(payload).encode("utf-8"))
         except Exception as e:
             if not self._warned:
                 log.warning("Langfuse emission failed (suppressing further warnings): %s", e)
                 self._warned = True
 
+    def _post(self, data: bytes) -> None:
+        self._http.post(self._ingestion_url, data, self._headers)
+
     def create_task_trace(
         self,
         task_id: str,
@@ -92,7 +201,7 @@ class LangfuseClient:
         difficulty: int,
         metadata: dict[str, Any] | None = None,
     ) -> str:
-        trace_id = str(uuid.uuid4())
+        trace_id = self._uuid_pool.next_uuid()
         body = {
             "id": trace_id,
             "name": f"task:{task_id}",
@@ -138,7 +247,7 @@ class LangfuseClient:
     ) -> str | None:
         if not trace_id:
             return None
-        generation_id = str(uuid.uuid4())
+        generation_id = self._uuid_pool.next_uuid()
         body = {
             "id": generation_id,
             "traceId": trace_id,
@@ -191,7 +300,7 @@ class LangfuseClient:
     ) -> str | None:
         if not trace_id:
             return None
-        span_id = str(uuid.uuid4())
+        span_id = self._uuid_pool.next_uuid()
         body: dict[str, Any] = {
             "id": span_id,
             "traceId": trace_id,
@@ -244,7 +353,7 @@ class LangfuseClient:
         if not trace_id:
             return
         body: dict[str, Any] = {
-            "id": str(uuid.uuid4()),
+            "id": self._uuid_pool.next_uuid(),
             "traceId": trace_id,
             "name": name,
         }
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import statistics
-from dataclasses import dataclass, field
+from collections import Counter
+from dataclasses import dataclass, field, fields
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskMetrics:
     task_id: str
     score: float                    # final_score from scorer
@@ -29,6 +30,8 @@ class TaskMetrics:
     total_tokens: int = 0
     input_tokens: int = 0
     output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
 
     # Error tracking
     error_occurred: bool = False
@@ -37,34 +40,13 @@ class TaskMetrics:
     http_status_code: int = 0  # 0 if not HTTP error
 
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "task_id": self.task_id,
-            "score": self.score,
-            "tier": self.tier,
-            "field_scores": self.field_scores,
-            "tool_calls_total": self.tool_calls_total,
-            "tool_calls_by_type": self.tool_calls_by_type,
-            "redundant_tool_calls": self.redundant_tool_calls,
-            "invalid_tool_calls": self.invalid_tool_calls,
-            "invalid_json_attempts": self.invalid_json_attempts,
-            "steps_to_answer": self.steps_to_answer,
-            "max_steps_hit": self.max_steps_hit,
-            "has_valid_answer": self.has_valid_answer,
-            "hallucinated_techniques": self.hallucinated_techniques,
-            "hallucination_count": self.hallucination_count,
-            "missing_techniques": self.missing_techniques,
-            "wall_time_seconds": self.wall_time_seconds,
-            "total_tokens": self.total_tokens,
-            "input_tokens": self.input_tokens,
-            "output_tokens": self.output_tokens,
-            "error_occurred": self.error_occurred,
-            "error_type": self.error_type,
-            "error_message": self.error_message,
-            "http_status_code": self.http_status_code,
-        }
+        return {name: getattr(self, name) for name in _TASK_FIELDS}
+
+
+_TASK_FIELDS = tuple(f.name for f in fields(TaskMetrics))
 
 
-@dataclass
+@dataclass(slots=True)
 class AggregateMetrics:
     success_rate: float = 0.0       # fraction with has_valid_answer
     main_score: float = 0.0         # avg of standard (1-12)
@@ -97,56 +79,54 @@ class AggregateMetrics:
 
     def to_dict(self) -> dict[str, Any]:
         return {
-            "success_rate": round(self.success_rate, 4),
-            "main_score": round(self.main_score, 4),
-            "bonus_score": round(self.bonus_score, 4),
-            "total_score": round(self.total_score, 4),
-            "avg_tool_calls_per_task": round(self.avg_tool_calls_per_task, 2),
-            "avg_tool_calls_per_success": round(self.avg_tool_calls_per_success, 2),
-            "tool_usage_distribution": self.tool_usage_distribution,
-            "avg_hallucination_rate": round(self.avg_hallucination_rate, 4),
-            "episode_length_min": round(self.episode_length_min, 2),
-            "episode_length_max": round(self.episode_length_max, 2),
-            "episode_length_mean": round(self.episode_length_mean, 2),
-            "episode_length_median": round(self.episode_length_median, 2),
-            "total_wall_time": round(self.total_wall_time, 2),
-            "total_tokens": self.total_tokens,
-            "max_steps_hit_count": self.max_steps_hit_count,
-            "tasks_run": self.tasks_run,
-            "tasks_with_answer": self.tasks_with_answer,
-            "total_errors": self.total_errors,
-            "errors_by_type": self.errors_by_type,
-            "errors_by_http_status": self.errors_by_http_status,
-            "context_overflow_errors": self.context_overflow_errors,
-            "timeout_errors": self.timeout_errors,
+            name: getattr(self, name) if digits is None else round(getattr(self, name), digits)
+            for name, digits in _AGGREGATE_FIELDS
         }
 
 
+# Decimal places each float metric is rounded to in reports
+_AGGREGATE_ROUNDING = {
+    "success_rate": 4,
+    "main_score": 4,
+    "bonus_score": 4,
+    "total_score": 4,
+    "avg_tool_calls_per_task": 2,
+    "avg_tool_calls_per_success": 2,
+    "avg_hallucination_rate": 4,
+    "episode_length_min": 2,
+    "episode_length_max": 2,
+    "episode_length_mean": 2,
+    "episode_length_median": 2,
+    "total_wall_time": 2,
+}
+_AGGREGATE_FIELDS = tuple(
+    (f.name, _AGGREGATE_ROUNDING.get(f.name)) for f in fields(AggregateMetrics)
+)
+
+
 def collect_task_metrics(
     task_id: str,
     agent_result: dict[str, Any],
     score_result: dict[str, Any],
 ) -> TaskMetrics:
+    # List and dict fields reference the caller's results rather than copies
     hallucinated = score_result.get("hallucinated_techniques", [])
+    tool_call_count = agent_result.get("tool_call_count", 0)
 
     # Extract error information from agent_result
     error_info = agent_result.get("error_info", {})
-    error_occurred = error_info.get("error_occurred", False)
-    error_type = error_info.get("error_type", "")
-    error_message = error_info.get("error_message", "")
-    http_status_code = error_info.get("http_status_code", 0)
 
     return TaskMetrics(
         task_id=task_id,
         score=score_result.get("final_score", 0.0),
         tier=score_result.get("tier", "standard"),
         field_scores=score_result.get("field_scores", {}),
-        tool_calls_total=agent_result.get("tool_call_count", 0),
+        tool_calls_total=tool_call_count,
         tool_calls_by_type=agent_result.get("tool_calls_by_type", {}),
         redundant_tool_calls=agent_result.get("redundant_tool_calls", 0),
         invalid_tool_calls=agent_result.get("invalid_tool_calls", 0),
         invalid_json_attempts=agent_result.get("invalid_json_attempts", 0),
-        steps_to_answer=agent_result.get("tool_call_count", 0),
+        steps_to_answer=tool_call_count,
         max_steps_hit=agent_result.get("max_steps_hit", False),
         has_valid_answer=agent_result.get("has_valid_answer", False),
         hallucinated_techniques=hallucinated,
@@ -156,10 +136,12 @@ def collect_task_metrics(
         total_tokens=agent_result.get("total_tokens", 0),
         input_tokens=agent_result.get("input_tokens", 0),
         output_tokens=agent_result.get("output_tokens", 0),
-        error_occurred=error_occurred,
-        error_type=error_type,
-        error_message=error_message,
-        http_status_code=http_status_code,
+        cache_read_input_tokens=agent_result.get("cache_read_input_tokens", 0),
+        cache_creation_input_tokens=agent_result.get("cache_creation_input_tokens", 0),
+        error_occurred=error_info.get("error_occurred", False),
+        error_type=error_info.get("error_type", ""),
+        error_message=error_info.get("error_message", ""),
+        http_status_code=error_info.get("http_status_code", 0),
     )
 
 
@@ -170,68 +152,52 @@ def compute_aggregate(task_metrics: list[TaskMetrics]) -> AggregateMetrics:
     agg = AggregateMetrics()
     agg.tasks_run = len(task_metrics)
 
-    # Separate standard vs bonus
-    standard = [m for m in task_metrics if m.tier == "standard"]
-    bonus = [m for m in task_metrics if m.tier == "bonus"]
-
-    agg.tasks_with_answer = sum(1 for m in task_metrics if m.has_valid_answer)
-    agg.success_rate = agg.tasks_with_answer / agg.tasks_run if agg.tasks_run else 0.0
-
-    agg.main_score = (
-        sum(m.score for m in standard) / len(standard) if standard else 0.0
-    )
-    agg.bonus_score = bonus[0].score if bonus else 0.0
-    agg.total_score = agg.main_score + agg.bonus_score
-
-    # Tool call stats
-    all_calls = [m.tool_calls_total for m in task_metrics]
-    agg.avg_tool_calls_per_task = (
-        sum(all_calls) / len(all_calls) if all_calls else 0.0
-    )
-
-    success_calls = [m.tool_calls_total for m in task_metrics if m.has_valid_answer]
-    agg.avg_tool_calls_per_success = (
-        sum(success_calls) / len(success_calls) if success_calls else 0.0
-    )
-
-    # Tool usage distribution
-    dist: dict[str, int] = {}
-    for m in task_metrics:
-        for tool, count in m.tool_calls_by_type.items():
-            dist[tool] = dist.get(tool, 0) + count
-    agg.tool_usage_distribution = dist
-
-    # Hallucination rate
-    halluc_counts = [m.hallucination_count for m in task_metrics]
-    agg.avg_hallucination_rate = (
-        sum(halluc_counts) / len(halluc_counts) if halluc_counts else 0.0
-    )
-
-    # Episode lengths (wall time)
-    times = [m.wall_time_seconds for m in task_metrics]
-    agg.episode_length_min = min(times)
-    agg.episode_length_max = max(times)
-    agg.episode_length_mean = statistics.mean(times)
-    agg.episode_length_median = statistics.median(times)
-
-    agg.total_wall_time = sum(times)
-    agg.total_tokens = sum(m.total_tokens for m in task_metrics)
-    agg.max_steps_hit_count = sum(1 for m in task_metrics if m.max_steps_hit)
-
-    # Error aggregation
-    agg.total_errors = sum(1 for m in task_metrics if m.error_occurred)
-
-    # Count errors by type
+    # Accumulate everything in one pass over the tasks
+    n_standard = 0
+    standard_score_sum = 0.0
+    bonus_score: float | None = None
+    tasks_with_answer = 0
+    calls_sum = 0
+    success_calls_sum = 0
+    halluc_sum = 0
+    total_tokens = 0
+    max_steps_hit_count = 0
+    total_errors = 0
+    dist: Counter[str] = Counter()
     errors_by_type: dict[str, int] = {}
     errors_by_http_status: dict[str, int] = {}
     context_overflow_count = 0
     timeout_count = 0
+    times: list[float] = []
 
     for m in task_metrics:
+        tier = m.tier
+        if tier == "standard":
+            n_standard += 1
+            standard_score_sum += m.score
+        elif tier == "bonus" and bonus_score is None:
+            bonus_score = m.score
+
+        calls = m.tool_calls_total
+        calls_sum += calls
+        if m.has_valid_answer:
+            tasks_with_answer += 1
+            success_calls_sum += calls
+
+        dist.update(m.tool_calls_by_type)
+
+        halluc_sum += m.hallucination_count
+        times.append(m.wall_time_seconds)
+        total_tokens += m.total_tokens
+        if m.max_steps_hit:
+            max_steps_hit_count += 1
+
         if m.error_occurred:
+            total_errors += 1
+            error_type = m.error_type
             # Count by error type
-            if m.error_type:
-                errors_by_type[m.error_type] = errors_by_type.get(m.error_type, 0) + 1
+            if error_type:
+                errors_by_type[error_type] = errors_by_type.get(error_type, 0) + 1
 
             # Count by HTTP status if applicable
             if m.http_status_code > 0:
@@ -239,11 +205,41 @@ def compute_aggregate(task_metrics: list[TaskMetrics]) -> AggregateMetrics:
                 errors_by_http_status[status_str] = errors_by_http_status.get(status_str, 0) + 1
 
             # Count specific error types
-            if m.error_type == "context_overflow":
+            if error_type == "context_overflow":
                 context_overflow_count += 1
-            elif m.error_type == "timeout":
+            elif error_type == "timeout":
                 timeout_count += 1
 
+    n = agg.tasks_run
+    agg.tasks_with_answer = tasks_with_answer
+    agg.success_rate = tasks_with_answer / n
+
+    agg.main_score = standard_score_sum / n_standard if n_standard else 0.0
+    agg.bonus_score = bonus_score if bonus_score is not None else 0.0
+    agg.total_score = agg.main_score + agg.bonus_score
+
+    # Tool call stats
+    agg.avg_tool_calls_per_task = calls_sum / n
+    agg.avg_tool_calls_per_success = (
+        success_calls_sum / tasks_with_answer if tasks_with_answer else 0.0
+    )
+    agg.tool_usage_distribution = dict(dist)
+
+    # Hallucination rate
+    agg.avg_hallucination_rate = halluc_sum / n
+
+    # Episode lengths (wall time)
+    agg.episode_length_min = min(times)
+    agg.episode_length_max = max(times)
+    agg.episode_length_mean = statistics.fmean(times)
+    agg.episode_length_median = statistics.median(times)
+
+    agg.total_wall_time = sum(times)
+    agg.total_tokens = total_tokens
+    agg.max_steps_hit_count = max_steps_hit_count
+
+    # Error aggregation
+    agg.total_errors = total_errors
     agg.errors_by_type = errors_by_type
     agg.errors_by_http_status = errors_by_http_status
     agg.context_overflow_errors = context_overflow_count
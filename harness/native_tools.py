@@ -0,0 +1,87 @@
+"""
+In-process versions of the ``strings`` and ``xxd`` tools for local runs.
+
+Both only format bytes from the file, so spawning a process per call is
+pure overhead. Output matches GNU strings (binutils >= 2.39, which scans
+the whole file by default) and xxd byte for byte, i.e. what the tool
+image produces. Anything these don't reproduce exactly (odd arguments,
+non-regular files) returns None so the caller runs the real tool.
+"""
+from __future__ import annotations
+
+import functools
+import mmap
+import os
+import re
+
+TOOLS = frozenset({"strings", "xxd"})
+
+# xxd's ASCII column: printable ASCII as-is, everything else as "."
+_XXD_ASCII = bytes(b if 0x20 <= b < 0x7F else 0x2E for b in range(256))
+
+
+@functools.lru_cache(maxsize=16)
+def _strings_pattern(min_length: int) -> re.Pattern[bytes]:
+    # GNU strings' default encoding: printable 7-bit ASCII plus tab
+    return re.compile(rb"[\t\x20-\x7e]{%d,}" % min_length)
+
+
+def strings(path: str, min_length: int = 4, max_chars: int | None = None) -> str:
+    """Printable runs of at least min_length bytes, one per line.
+
+    Stops once the output exceeds max_chars; the caller truncates anyway.
+    """
+    found = []
+    size = 0
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""  # mmap rejects empty files
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for match in _strings_pattern(min_length).finditer(mm):
+                text = match.group().decode("ascii")
+                found.append(text)
+                size += len(text) + 1
+                if max_chars is not None and size > max_chars:
+                    break
+    return "".join(s + "\n" for s in found)
+
+
+def xxd(path: str, offset: int = 0, length: int = 256) -> str:
+    """Plain ``xxd -s offset -l length`` dump: 16 bytes per line in 2-byte groups."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    lines = []
+    for i in range(0, len(data), 16):
+        row = data[i:i+16]
+        hexed = row.hex()
+        groups = " ".join(hexed[j:j+4] for j in range(0, len(hexed), 4))
+        lines.append(f"{offset + i:08x}: {groups:<39}  {row.translate(_XXD_ASCII).decode('ascii')}\n")
+    return "".join(lines)
+
+
+def run(cmd: list[str], max_chars: int | None = None) -> tuple[str, str, int] | None:
+    """
+    Answer a command built by ToolExecutor in-process.
+
+    Returns (stdout, stderr, returncode), or None when the real tool should
+    run instead.
+    """
+    tool, path = cmd[0], cmd[-1]
+    if not os.path.isfile(path):
+        return None
+    try:
+        if tool == "strings":
+            min_length = int(cmd[2]) if cmd[1] == "-n" else 4
+            if min_length < 1:
+                return None  # strings rejects it; let it word the error
+            return strings(path, min_length, max_chars), "", 0
+        if tool == "xxd":
+            # ["xxd", "-s", offset, "-l", length, path]
+            offset, length = int(cmd[2]), int(cmd[4])
+            if offset < 0 or length <= 0:
+                return None  # xxd seeks from the end / rejects these
+            return xxd(path, offset, length), "", 0
+    except OSError:
+        return None
+    return None
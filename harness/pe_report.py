@@ -0,0 +1,94 @@
+"""
+PE summary report for the ``pefile`` tool.
+
+Standalone like entropy.py: the Docker sandbox runs this file's source with
+``python3 -c`` (see tools.PEFILE_SCRIPT), while local runs call run()
+in-process and reuse each parsed binary across calls. Needs the third-party
+``pefile`` package only when a report is actually requested.
+"""
+import io
+import os
+import sys
+
+FLAGS = ("headers", "sections", "imports", "exports", "resources", "all")
+
+
+def write_report(pe, flags, out):
+    def emit(*args):
+        print(*args, file=out)
+
+    if flags == 'headers' or flags == 'all':
+        emit("=== DOS HEADER ===")
+        emit(pe.DOS_HEADER)
+        emit("\n=== NT HEADERS ===")
+        emit(pe.NT_HEADERS)
+        emit("\n=== OPTIONAL HEADER ===")
+        emit(pe.OPTIONAL_HEADER)
+
+    if flags == 'sections' or flags == 'all':
+        emit("\n=== SECTIONS ===")
+        for section in pe.sections:
+            emit(f"{section.Name.decode().rstrip(chr(0))}:")
+            emit(f"  Virtual Address: 0x{section.VirtualAddress:x}")
+            emit(f"  Virtual Size: 0x{section.Misc_VirtualSize:x}")
+            emit(f"  Raw Size: 0x{section.SizeOfRawData:x}")
+            emit(f"  Characteristics: 0x{section.Characteristics:x}")
+
+    if flags == 'imports' or flags == 'all':
+        emit("\n=== IMPORTS ===")
+        if hasattr(pe, 'DIRECTORY_ENTRY_IMPORT'):
+            for entry in pe.DIRECTORY_ENTRY_IMPORT:
+                emit(f"{entry.dll.decode()}:")
+                for imp in entry.imports:
+                    if imp.name:
+                        emit(f"  {imp.name.decode()}")
+
+    if flags == 'exports' or flags == 'all':
+        emit("\n=== EXPORTS ===")
+        if hasattr(pe, 'DIRECTORY_ENTRY_EXPORT'):
+            for exp in pe.DIRECTORY_ENTRY_EXPORT.symbols:
+                emit(f"  {exp.name.decode() if exp.name else 'ordinal=' + str(exp.ordinal)}")
+
+    if flags == 'resources' or flags == 'all':
+        emit("\n=== RESOURCES ===")
+        if hasattr(pe, 'DIRECTORY_ENTRY_RESOURCE'):
+            emit("Resource directory present")
+
+
+def run(argv, cache=None):
+    """
+    Run with CLI-style args [path, flags]; return (stdout, stderr, returncode).
+
+    With a cache dict, parsed files are kept open and reused, keyed by
+    (path, mtime_ns, size); the caller owns closing them.
+    """
+    out = io.StringIO()
+    try:
+        import pefile
+
+        path, flags = argv[0], argv[1]
+        pe = None
+        key = None
+        if cache is not None:
+            st = os.stat(path)
+            key = (path, st.st_mtime_ns, st.st_size)
+            pe = cache.get(key)
+        if pe is None:
+            pe = pefile.PE(path)
+            if key is not None:
+                cache[key] = pe
+        try:
+            write_report(pe, flags, out)
+        finally:
+            if key is None:
+                pe.close()
+    except Exception as e:
+        return out.getvalue(), f"Error: {str(e)}\n", 1
+    return out.getvalue(), "", 0
+
+
+if __name__ == "__main__":
+    stdout, stderr, returncode = run(sys.argv[1:])
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    sys.exit(returncode)
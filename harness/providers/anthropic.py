@@ -3,20 +3,45 @@ from __future__ import annotations
 import json
 import logging
 import urllib.error
-import urllib.request
 
-from .base import AgentProvider, ProviderResponse, ToolCall
+from .base import AgentProvider, MessageConversionCache, ProviderResponse, ToolCall
+from .http_client import default_client, encode_json_body
 
 log = logging.getLogger(__name__)
 
 API_URL = "https://api.anthropic.com/v1/messages"
 API_VERSION = "2023-06-01"
 
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _with_cache_breakpoint(message: dict) -> dict:
+    """Return a copy of message whose last content block is a cache breakpoint."""
+    content = message["content"]
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = list(content)
+    if not blocks:
+        return message
+    blocks[-1] = {**blocks[-1], "cache_control": CACHE_CONTROL}
+    return {**message, "content": blocks}
+
 
 class AnthropicProvider(AgentProvider):
     def __init__(self, api_key: str, model: str):
         self.api_key = api_key
         self.model = model
+        self._headers = {
+            "Content-Type": "application/json",
+            "x-api-key": api_key,
+            "anthropic-version": API_VERSION,
+        }
+        # Messages are already in wire format; the cache only keeps their JSON
+        self._message_cache = MessageConversionCache(lambda msg: [msg])
+        self._tools_source: list[dict] | None = None
+        self._prefix_key: tuple[str, int] | None = None
+        self._body_prefix = b""
 
     def create_message(
         self,
@@ -25,26 +50,19 @@ class AnthropicProvider(AgentProvider):
         tools: list[dict],
         max_tokens: int = 4096,
     ) -> ProviderResponse:
-        body = {
-            "model": self.model,
-            "max_tokens": max_tokens,
-            "system": system,
-            "messages": messages,
-            "tools": tools,
-        }
-
-        headers = {
-            "Content-Type": "application/json",
-            "x-api-key": self.api_key,
-            "anthropic-version": API_VERSION,
-        }
-
-        data = json.dumps(body).encode("utf-8")
-        req = urllib.request.Request(API_URL, data=data, headers=headers, method="POST")
+        # Prompt caching: the system block caches tools + system prompt, and
+        # a breakpoint on the newest message lets the next turn read the
+        # whole transcript so far from cache. The caller's list is not mutated.
+        data = self._static_prefix(system, tools, max_tokens)
+        if messages:
+            history = self._message_cache.encode(messages[:-1])
+            if history:
+                data += history + b","
+            data += encode_json_body(_with_cache_breakpoint(messages[-1]))
+        data += b"]}"
 
         try:
-            with urllib.request.urlopen(req, timeout=300) as resp:
-                result = json.loads(resp.read().decode("utf-8"))
+            result = json.loads(default_client.post(API_URL, data, self._headers))
         except urllib.error.HTTPError as e:
             error_body = e.read().decode("utf-8", errors="replace")
             log.error("Anthropic API error %d: %s", e.code, error_body)
@@ -54,9 +72,10 @@ class AnthropicProvider(AgentProvider):
         tool_calls = []
 
         for block in result.get("content", []):
-            if block.get("type") == "text":
+            block_type = block.get("type")
+            if block_type == "text":
                 text_parts.append(block["text"])
-            elif block.get("type") == "tool_use":
+            elif block_type == "tool_use":
                 tool_calls.append(
                     ToolCall(
                         id=block["id"],
@@ -73,4 +92,27 @@ class AnthropicProvider(AgentProvider):
             tool_calls=tool_calls,
             input_tokens=usage.get("input_tokens", 0),
             output_tokens=usage.get("output_tokens", 0),
+            cache_read_input_tokens=usage.get("cache_read_input_tokens") or 0,
+            cache_creation_input_tokens=usage.get("cache_creation_input_tokens") or 0,
         )
+
+    def _static_prefix(self, system: str, tools: list[dict], max_tokens: int) -> bytes:
+        """
+        Serialized request body up to the opening of the messages array.
+
+        "messages" is encoded last so the per-turn transcript can be appended
+        as raw JSON.
+        """
+        key = (system, max_tokens)
+        if tools is not self._tools_source or key != self._prefix_key:
+            body = {
+                "model": self.model,
+                "max_tokens": max_tokens,
+                "system": [{"type": "text", "text": system, "cache_control": CACHE_CONTROL}],
+                "tools": tools,
+                "messages": [],
+            }
+            self._body_prefix = encode_json_body(body)[:-2]  # strip "]}"
+            self._tools_source = tools
+            self._prefix_key = key
+        return self._body_prefix
@@ -2,9 +2,13 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from itertools import chain
+from typing import Callable
 
+from .http_client import encode_json_body
 
-@dataclass
+
+@dataclass(slots=True)
 class ToolCall:
     id: str
     name: str
@@ -12,13 +16,69 @@ class ToolCall:
     metadata: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderResponse:
     stop_reason: str        # "tool_use" | "end_turn" | "max_tokens"
     text_content: str       # concatenated text blocks
     tool_calls: list[ToolCall] = field(default_factory=list)
-    input_tokens: int = 0
+    input_tokens: int = 0   # uncached prompt tokens
     output_tokens: int = 0
+    cache_read_input_tokens: int = 0      # prompt tokens served from the provider's cache
+    cache_creation_input_tokens: int = 0  # prompt tokens written to the cache
+
+    @property
+    def total_tokens(self) -> int:
+        """Every prompt token processed (cached or not) plus the output."""
+        return (
+            self.input_tokens + self.cache_read_input_tokens
+            + self.cache_creation_input_tokens + self.output_tokens
+        )
+
+
+class MessageConversionCache:
+    """
+    Incrementally convert an append-only transcript to a provider's wire format.
+
+    The agent loop only ever appends to its message list, so each turn the
+    already-converted prefix is reused (matched by object identity) and only
+    the new messages are passed to ``convert``. ``encode`` likewise keeps
+    each message's serialized JSON, so only the new tail is encoded.
+    """
+
+    def __init__(self, convert: Callable[[dict], list[dict]]):
+        self._convert = convert
+        self._sources: list[dict] = []
+        self._converted: list[list[dict]] = []
+        self._encoded: list[bytes | None] = []
+
+    def convert(self, messages: list[dict]) -> list[dict]:
+        self._sync(messages)
+        return list(chain.from_iterable(self._converted))
+
+    def encode(self, messages: list[dict]) -> bytes:
+        """Return the converted messages as comma-separated JSON (no brackets)."""
+        self._sync(messages)
+        fragments = []
+        for i, fragment in enumerate(self._encoded):
+            if fragment is None:
+                fragment = b",".join(encode_json_body(m) for m in self._converted[i])
+                self._encoded[i] = fragment
+            if fragment:
+                fragments.append(fragment)
+        return b",".join(fragments)
+
+    def _sync(self, messages: list[dict]) -> None:
+        n = 0
+        limit = min(len(messages), len(self._sources))
+        while n < limit and self._sources[n] is messages[n]:
+            n += 1
+        del self._sources[n:]
+        del self._converted[n:]
+        del self._encoded[n:]
+        for msg in messages[n:]:
+            self._sources.append(msg)
+            self._converted.append(self._convert(msg))
+            self._encoded.append(None)
 
 
 class AgentProvider(ABC):
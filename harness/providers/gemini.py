@@ -2,20 +2,32 @@ from __future__ import annotations
 
 import json
 import logging
-import urllib.request
+import urllib.error
 
-from .base import AgentProvider, ProviderResponse, ToolCall
+from .base import AgentProvider, MessageConversionCache, ProviderResponse, ToolCall
+from .http_client import default_client, encode_json_body
 from ..tools import schemas_to_gemini_declarations
 
 log = logging.getLogger(__name__)
 
 API_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+HEADERS = {"Content-Type": "application/json"}
+
+# finishReason -> stop_reason when no function was called
+FINISH_REASONS = {"MAX_TOKENS": "max_tokens"}
 
 
 class GeminiProvider(AgentProvider):
     def __init__(self, api_key: str, model: str):
         self.api_key = api_key
         self.model = model
+        self._url = f"{API_URL}/{model}:generateContent?key={api_key}"
+        self._message_cache = MessageConversionCache(self._convert_message)
+        # The agent passes the same system prompt, schema list and max_tokens
+        # every turn; serialize everything but the transcript once
+        self._tools_source: list[dict] | None = None
+        self._prefix_key: tuple[str, int] | None = None
+        self._body_prefix = b""
 
     def create_message(
         self,
@@ -24,23 +36,14 @@ class GeminiProvider(AgentProvider):
         tools: list[dict],
         max_tokens: int = 4096,
     ) -> ProviderResponse:
-        declarations = schemas_to_gemini_declarations(tools)
-
-        body = {
-            "system_instruction": {"parts": [{"text": system}]},
-            "contents": self._convert_messages(messages),
-            "tools": [{"function_declarations": declarations}],
-            "generationConfig": {"maxOutputTokens": max_tokens},
-        }
-
-        url = f"{API_URL}/{self.model}:generateContent?key={self.api_key}"
-        headers = {"Content-Type": "application/json"}
-        data = json.dumps(body).encode("utf-8")
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
+        data = (
+            self._static_prefix(system, tools, max_tokens)
+            + self._message_cache.encode(messages)
+            + b"]}"
+        )
 
         try:
-            with urllib.request.urlopen(req, timeout=300) as resp:
-                result = json.loads(resp.read().decode("utf-8"))
+            result = json.loads(default_client.post(self._url, data, HEADERS))
         except urllib.error.HTTPError as e:
             error_body = e.read().decode("utf-8", errors="replace")
             log.error("Gemini API error %s: %s", e.code, error_body)
@@ -67,14 +70,15 @@ class GeminiProvider(AgentProvider):
             elif "text" in part:
                 text_parts.append(part["text"])
 
-        stop_reason = "end_turn"
         if tool_calls:
             stop_reason = "tool_use"
-        elif candidate.get("finishReason") == "MAX_TOKENS":
-            stop_reason = "max_tokens"
+        else:
+            stop_reason = FINISH_REASONS.get(candidate.get("finishReason"), "end_turn")
 
         usage = result.get("usageMetadata", {})
-        input_tokens = usage.get("promptTokenCount", 0)
+        # promptTokenCount includes implicitly cached tokens
+        cached_tokens = usage.get("cachedContentTokenCount", 0)
+        input_tokens = usage.get("promptTokenCount", 0) - cached_tokens
         output_tokens = usage.get("candidatesTokenCount", 0)
 
         return ProviderResponse(
@@ -83,61 +87,79 @@ class GeminiProvider(AgentProvider):
             tool_calls=tool_calls,
             input_tokens=input_tokens,
             output_tokens=output_tokens,
+            cache_read_input_tokens=cached_tokens,
         )
 
-    def _convert_messages(self, messages: list[dict]) -> list[dict]:
-        gemini_msgs = []
-
-        for msg in messages:
-            role = msg["role"]
-            content = msg["content"]
-
-            if role == "user":
-                parts = []
-                if isinstance(content, str):
-                    parts.append({"text": content})
-                else:
-                    for block in content:
-                        if isinstance(block, str):
-                            parts.append({"text": block})
-                        elif isinstance(block, dict):
-                            if block.get("type") == "text":
-                                parts.append({"text": block.get("text", "")})
-                            elif block.get("type") == "tool_result":
-                                result_content = block.get("content", "")
-                                if isinstance(result_content, list):
-                                    result_content = "\n".join(
-                                        b.get("text", "") for b in result_content
-                                        if isinstance(b, dict)
-                                    )
-                                parts.append({
-                                    "functionResponse": {
-                                        "name": block.get("tool_name", "unknown"),
-                                        "response": {"result": str(result_content)},
-                                    }
-                                })
-                gemini_msgs.append({"role": "user", "parts": parts or [{"text": ""}]})
-
-            elif role == "assistant":
-                parts = []
-                if isinstance(content, str):
-                    parts.append({"text": content})
-                else:
-                    for block in content:
-                        if isinstance(block, dict):
-                            if block.get("type") == "text":
-                                parts.append({"text": block.get("text", "")})
-                            elif block.get("type") == "tool_use":
-                                fc_part = {
-                                    "functionCall": {
-                                        "name": block["name"],
-                                        "args": block.get("input", {}),
-                                    }
+    def _static_prefix(self, system: str, tools: list[dict], max_tokens: int) -> bytes:
+        """
+        Serialized request body up to the opening of the contents array.
+
+        "contents" is encoded last so the per-turn transcript can be appended
+        as raw JSON.
+        """
+        key = (system, max_tokens)
+        if tools is not self._tools_source or key != self._prefix_key:
+            body = {
+                "system_instruction": {"parts": [{"text": system}]},
+                "tools": [{"function_declarations": schemas_to_gemini_declarations(tools)}],
+                "generationConfig": {"maxOutputTokens": max_tokens},
+                "contents": [],
+            }
+            self._body_prefix = encode_json_body(body)[:-2]  # strip "]}"
+            self._tools_source = tools
+            self._prefix_key = key
+        return self._body_prefix
+
+    def _convert_message(self, msg: dict) -> list[dict]:
+        role = msg["role"]
+        content = msg["content"]
+
+        if role == "user":
+            parts = []
+            if isinstance(content, str):
+                parts.append({"text": content})
+            else:
+                for block in content:
+                    if isinstance(block, str):
+                        parts.append({"text": block})
+                    elif isinstance(block, dict):
+                        if block.get("type") == "text":
+                            parts.append({"text": block.get("text", "")})
+                        elif block.get("type") == "tool_result":
+                            result_content = block.get("content", "")
+                            if isinstance(result_content, list):
+                                result_content = "\n".join(
+                                    b.get("text", "") for b in result_content
+                                    if isinstance(b, dict)
+                                )
+                            parts.append({
+                                "functionResponse": {
+                                    "name": block.get("tool_name", "unknown"),
+                                    "response": {"result": str(result_content)},
                                 }
-                                sig = block.get("metadata", {}).get("thoughtSignature")
-                                if sig:
-                                    fc_part["thoughtSignature"] = sig
-                                parts.append(fc_part)
-                gemini_msgs.append({"role": "model", "parts": parts or [{"text": ""}]})
-
-        return gemini_msgs
+                            })
+            return [{"role": "user", "parts": parts or [{"text": ""}]}]
+
+        if role == "assistant":
+            parts = []
+            if isinstance(content, str):
+                parts.append({"text": content})
+            else:
+                for block in content:
+                    if isinstance(block, dict):
+                        if block.get("type") == "text":
+                            parts.append({"text": block.get("text", "")})
+                        elif block.get("type") == "tool_use":
+                            fc_part = {
+                                "functionCall": {
+                                    "name": block["name"],
+                                    "args": block.get("input", {}),
+                                }
+                            }
+                            sig = block.get("metadata", {}).get("thoughtSignature")
+                            if sig:
+                                fc_part["thoughtSignature"] = sig
+                            parts.append(fc_part)
+            return [{"role": "model", "parts": parts or [{"text": ""}]}]
+
+        return []
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import http.client
+import io
+import json
+import logging
+import ssl
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+log = logging.getLogger(__name__)
+
+# Request bodies carry the whole transcript; skip the default ", "/": "
+# padding and reuse one encoder instead of building one per json.dumps call
+_BODY_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def encode_json_body(body: dict) -> bytes:
+    """Serialize a request body to compact JSON bytes."""
+    return _BODY_ENCODER.encode(body).encode("ascii")
+
+
+class KeepAliveHTTPClient:
+    """
+    Minimal stdlib HTTP client that keeps connections open between requests.
+
+    Idle connections are pooled per (scheme, host) so consecutive model calls
+    skip the TCP/TLS handshake. Non-2xx responses raise
+    ``urllib.error.HTTPError`` exactly like ``urllib.request.urlopen``, so
+    callers' error handling is unchanged. Hosts that must go through a proxy
+    (per the usual *_proxy environment variables) are sent via urlopen.
+    All HTTPS connections share one SSL context, so the CA bundle is loaded
+    once rather than per connection. Safe to share between threads.
+    """
+
+    def __init__(self, timeout: float = 300, max_idle_per_host: int = 8):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._proxied: dict[tuple[str, str], bool] = {}
+        self._ssl_context: ssl.SSLContext | None = None
+        self._lock = threading.Lock()
+
+    def post(self, url: str, data: bytes, headers: dict[str, str]) -> bytes:
+        """POST data to url and return the response body."""
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        if self._is_proxied(key, parts.hostname or ""):
+            req = urllib.request.Request(url, data=data, headers=headers, method="POST")
+            context = self._get_ssl_context() if parts.scheme == "https" else None
+            with urllib.request.urlopen(req, timeout=self.timeout, context=context) as resp:
+                return resp.read()
+
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        # A pooled connection may have been closed by the server while idle;
+        # retry once on a fresh one. Timeouts are not retried.
+        can_retry = True
+        while True:
+            conn, reused = self._acquire(key)
+            try:
+                conn.request("POST", path, body=data, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except ConnectionError:
+                conn.close()
+                if reused and can_retry:
+                    can_retry = False
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+
+            if resp.status >= 400:
+                raise urllib.error.HTTPError(
+                    url, resp.status, resp.reason, resp.headers, io.BytesIO(body)
+                )
+            return body
+
+    def _is_proxied(self, key: tuple[str, str], host: str) -> bool:
+        proxied = self._proxied.get(key)
+        if proxied is None:
+            proxied = (
+                bool(urllib.request.getproxies().get(key[0]))
+                and not urllib.request.proxy_bypass(host)
+            )
+            self._proxied[key] = proxied
+        return proxied
+
+    def _get_ssl_context(self) -> ssl.SSLContext:
+        with self._lock:
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return self._ssl_context
+
+    def _acquire(self, key: tuple[str, str]) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        scheme, netloc = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                netloc, timeout=self.timeout, context=self._get_ssl_context()
+            )
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+        return conn, False
+
+    def _release(self, key: tuple[str, str], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+
+# Shared by all providers so connections also survive across tasks
+default_client = KeepAliveHTTPClient()
@@ -2,23 +2,35 @@ from __future__ import annotations
 
 import json
 import logging
-import urllib.request
+import urllib.error
 
-from .base import AgentProvider, ProviderResponse, ToolCall
+from .base import AgentProvider, MessageConversionCache, ProviderResponse, ToolCall
+from .http_client import default_client, encode_json_body
 from ..tools import schemas_to_openai
 
 log = logging.getLogger(__name__)
 
 DEFAULT_BASE_URL = "https://api.openai.com/v1"
 
+# finish_reason -> stop_reason; anything else ends the turn
+FINISH_REASONS = {"tool_calls": "tool_use", "length": "max_tokens"}
+
 
 class OpenAIProvider(AgentProvider):
     def __init__(self, api_key: str, model: str, base_url: str | None = None, is_bedrock_anthropic: bool = False, custom_headers: dict[str, str] | None = None):
         self.api_key = api_key
         self.model = model
         self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        self._chat_url = f"{self.base_url}/chat/completions"
         self.is_bedrock_anthropic = is_bedrock_anthropic
         self.custom_headers = custom_headers or {}
+        self._message_cache = MessageConversionCache(self._convert_message)
+        # The agent passes the same system prompt, schema list and max_tokens
+        # every turn; serialize everything but the transcript once
+        self._tools_source: list[dict] | None = None
+        self._prefix_key: tuple[str, int] | None = None
+        self._body_prefix = b""
+        self._headers: dict[str, str] | None = None
 
     def _token_param(self) -> str:
         """Parameter name for max output tokens. Override for API compatibility."""
@@ -42,29 +54,20 @@ class OpenAIProvider(AgentProvider):
         tools: list[dict],
         max_tokens: int = 4096,
     ) -> ProviderResponse:
-        openai_tools = schemas_to_openai(tools)
-
-        oai_messages = [{"role": "system", "content": system}]
-        for msg in messages:
-            oai_messages.extend(self._convert_message(msg))
-
-        body = {
-            "model": self.model,
-            "messages": oai_messages,
-            "tools": openai_tools,
-            "tool_choice": "auto",  # Allow model to choose when to use tools
-            self._token_param(): max_tokens,
-        }
-
-        headers = self._request_headers()
-
-        data = json.dumps(body).encode("utf-8")
-        url = f"{self.base_url}/chat/completions"
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
+        history = self._message_cache.encode(messages)
+        data = self._static_prefix(system, tools, max_tokens)
+        if history:
+            data += b"," + history
+        data += b"]}"
+
+        # Headers are fixed per instance; built lazily so subclass overrides
+        # of _request_headers see a fully initialized instance
+        if self._headers is None:
+            self._headers = self._request_headers()
+        headers = self._headers
 
         try:
-            with urllib.request.urlopen(req, timeout=300) as resp:
-                result = json.loads(resp.read().decode("utf-8"))
+            result = json.loads(default_client.post(self._chat_url, data, headers))
         except urllib.error.HTTPError as e:
             error_body = e.read().decode("utf-8", errors="replace")
             log.error("OpenAI-compatible API error %d: %s", e.code, error_body)
@@ -108,23 +111,47 @@ class OpenAIProvider(AgentProvider):
                 stop_reason = "end_turn"
         else:
             # Standard OpenAI mode: check finish_reason
-            if choice.get("finish_reason") == "tool_calls":
-                stop_reason = "tool_use"
-            elif choice.get("finish_reason") == "length":
-                stop_reason = "max_tokens"
-            else:
-                stop_reason = "end_turn"
+            stop_reason = FINISH_REASONS.get(choice.get("finish_reason"), "end_turn")
 
         usage = result.get("usage", {})
+        # prompt_tokens includes automatically cached prefix tokens
+        # (OpenAI: prompt_tokens_details.cached_tokens, DeepSeek: prompt_cache_hit_tokens)
+        cached_tokens = (
+            (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+            or usage.get("prompt_cache_hit_tokens")
+            or 0
+        )
 
         return ProviderResponse(
             stop_reason=stop_reason,
             text_content=message.get("content") or "",
             tool_calls=tool_calls,
-            input_tokens=usage.get("prompt_tokens", 0),
+            input_tokens=usage.get("prompt_tokens", 0) - cached_tokens,
             output_tokens=usage.get("completion_tokens", 0),
+            cache_read_input_tokens=cached_tokens,
         )
 
+    def _static_prefix(self, system: str, tools: list[dict], max_tokens: int) -> bytes:
+        """
+        Serialized request body up to and including the system message.
+
+        "messages" is encoded last so the per-turn transcript can be appended
+        as raw JSON; the result ends inside the still-open messages array.
+        """
+        key = (system, max_tokens)
+        if tools is not self._tools_source or key != self._prefix_key:
+            body = {
+                "model": self.model,
+                "tools": schemas_to_openai(tools),
+                "tool_choice": "auto",  # Allow model to choose when to use tools
+                self._token_param(): max_tokens,
+                "messages": [{"role": "system", "content": system}],
+            }
+            self._body_prefix = encode_json_body(body)[:-2]  # strip "]}"
+            self._tools_source = tools
+            self._prefix_key = key
+        return self._body_prefix
+
     def _convert_message(self, msg: dict) -> list[dict]:
         role = msg["role"]
 
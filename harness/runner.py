@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
+from types import ModuleType
 from typing import Any
 
 from .agent import AgentLoop
@@ -17,11 +21,22 @@ from .metrics import (
     compute_aggregate,
 )
 from .providers import create_provider
+from .tool_cache import ToolCache, canonical_json
 from .tools import ToolExecutor
 
 log = logging.getLogger(__name__)
 
 
+def _import_scorer(project_root: Path) -> ModuleType:
+    """Import the project's top-level scorer module, adding it to sys.path once."""
+    root = str(project_root)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    import scorer
+
+    return scorer
+
+
 @dataclass
 class TaskConfig:
     task_id: str
@@ -86,25 +101,90 @@ Provide these in the encryption_details, decoded_strings, and anti_analysis fiel
 """
 
 
+# Only the binary path and file type vary per task; fill in the bonus block
+# up front, keyed by whether the task is a bonus sample
+_PROMPT_TEMPLATES = {
+    is_bonus: SYSTEM_PROMPT_TEMPLATE.format(
+        binary_path="{binary_path}",
+        file_type="{file_type}",
+        bonus_instructions=BONUS_INSTRUCTIONS if is_bonus else "",
+    )
+    for is_bonus in (False, True)
+}
+
+
 def build_system_prompt(task: TaskConfig, config: BenchmarkConfig) -> str:
     if config.use_docker:
         binary_display = f"/workspace/{task.binary_path.name}"
     else:
         binary_display = str(task.binary_path)
 
-    bonus = BONUS_INSTRUCTIONS if task.difficulty >= 13 else ""
-
-    return SYSTEM_PROMPT_TEMPLATE.format(
+    return _PROMPT_TEMPLATES[task.difficulty >= 13].format(
         binary_path=binary_display,
         file_type=task.file_type,
-        bonus_instructions=bonus,
     )
 
 
+def _task_result_key(task: TaskConfig, config: BenchmarkConfig, system_prompt: str) -> str:
+    """Content hash of everything that determines a task's scored result."""
+    digest = hashlib.sha256()
+    for path in (task.binary_path, task.ground_truth_path):
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        digest.update(b"\0")
+    settings = {
+        "provider": config.provider,
+        "model": config.model,
+        "system_prompt": system_prompt,
+        "max_tool_calls": config.max_tool_calls,
+        "max_tokens": config.max_tokens,
+        "allowed_tools": config.allowed_tools,
+        # Endpoint and transport settings decide which model answers
+        "openai_base_url": config.openai_base_url,
+        "is_bedrock_anthropic": config.is_bedrock_anthropic,
+        # Header values may be credentials; key on a digest, never the values
+        "openai_custom_headers": hashlib.sha256(
+            canonical_json(config.openai_custom_headers).encode("utf-8")
+        ).hexdigest(),
+        # Tool settings shape what the model sees
+        "max_output_chars": config.max_output_chars,
+        "tool_timeout_seconds": config.tool_timeout_seconds,
+        "docker_image": config.docker_image if config.use_docker else None,
+    }
+    digest.update(canonical_json(settings).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _load_task_result(path: Path) -> tuple[TaskMetrics, dict[str, Any]] | None:
+    try:
+        data = json.loads(path.read_bytes())
+        return TaskMetrics(**data["metrics"]), data["score"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        log.warning("Ignoring unreadable task result cache entry %s: %s", path, e)
+        return None
+
+
+def _save_task_result(path: Path, metrics: TaskMetrics, score_result: dict[str, Any]) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump({"metrics": metrics.to_dict(), "score": score_result}, f, default=str)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log.warning("Failed to write task result cache entry %s: %s", path, e)
+        tmp_path.unlink(missing_ok=True)
+
+
 def run_single_task(
     task: TaskConfig,
     config: BenchmarkConfig,
     langfuse_client=None,
+    tool_cache: ToolCache | None = None,
+    quiet: bool = False,
 ) -> tuple[TaskMetrics, dict[str, Any]]:
     # Validate binary exists
     if not task.binary_path.exists():
@@ -113,8 +193,21 @@ def run_single_task(
     # Load ground truth
     gt = json.loads(task.ground_truth_path.read_text())
 
+    # Build system prompt
+    system_prompt = build_system_prompt(task, config)
+
+    # Replay a previously scored result when nothing that affects it changed
+    cache_path = None
+    if config.reuse_task_results:
+        cache_path = config.task_cache_dir / f"{_task_result_key(task, config, system_prompt)}.json"
+        cached = _load_task_result(cache_path)
+        if cached is not None:
+            if config.verbose and not quiet:
+                print("  (reusing cached result)")
+            return cached
+
     # Create tool executor
-    tool_executor = ToolExecutor(config, task.binary_path)
+    tool_executor = ToolExecutor(config, task.binary_path, cache=tool_cache)
 
     # Create provider
     api_key = config.resolve_api_key()
@@ -123,9 +216,6 @@ def run_single_task(
     custom_headers = config.openai_custom_headers if config.provider == "openai" else None
     provider = create_provider(config.provider, config.model, api_key, base_url, is_bedrock, custom_headers)
 
-    # Build system prompt
-    system_prompt = build_system_prompt(task, config)
-
     trace_id = None
     if langfuse_client is not None:
         trace_id = langfuse_client.create_task_trace(
@@ -145,12 +235,17 @@ def run_single_task(
         file_type=task.file_type,
         max_tool_calls=config.max_tool_calls,
         max_tokens=config.max_tokens,
-        verbose=config.verbose,
+        verbose=config.verbose and not quiet,
+        show_progress=not quiet,
         langfuse=langfuse_client,
         langfuse_trace_id=trace_id,
+        langfuse_capture_messages=config.langfuse_capture_messages,
+        parallel_tool_calls=config.enable_parallel_tool_execution,
+        max_tool_concurrency=config.max_tool_concurrency,
     )
     try:
-        agent_result = agent_loop.run()
+        with tool_executor:
+            agent_result = agent_loop.run()
     except Exception as e:
         if langfuse_client is not None and trace_id:
             langfuse_client.update_trace(
@@ -171,10 +266,7 @@ def run_single_task(
         json.dump(final_answer, f, indent=2)
 
     # Score using the existing scorer
-    sys.path.insert(0, str(config.project_root))
-    from scorer import score_sample
-
-    score_result = score_sample(gt, final_answer, str(task.ground_truth_path))
+    score_result = _import_scorer(config.project_root).score_sample(gt, final_answer, str(task.ground_truth_path))
     score_result["sample"] = task.task_id
 
     # Collect metrics
@@ -223,9 +315,29 @@ def run_single_task(
     with open(full_transcript_path, "w") as f:
         json.dump(agent_result.get("transcript", []), f, indent=2, default=str)
 
+    # Provider/tool failures are not worth replaying on the next run
+    if cache_path is not None and not metrics.error_occurred:
+        _save_task_result(cache_path, metrics, score_result)
+
     return metrics, score_result
 
 
+def _record_task_failure(
+    task: TaskConfig,
+    error: Exception,
+    config: BenchmarkConfig,
+    langfuse_client,
+) -> None:
+    log.error("Task %s failed: %s", task.task_id, error, exc_info=error)
+    if config.langfuse_enabled:
+        langfuse_client.create_event(
+            trace_id=None,
+            name="task_failed_unhandled",
+            output={"task_id": task.task_id, "error": str(error)},
+            level="ERROR",
+        )
+
+
 def run_benchmark(
     config: BenchmarkConfig,
     task_filter: str | None = None,
@@ -256,60 +368,94 @@ def run_benchmark(
     )
     if config.langfuse_enabled:
         print(f"  Langfuse: enabled ({config.langfuse_host})")
-
-    for i, task in enumerate(tasks, 1):
-        if config.verbose:
-            # Verbose: full header, agent prints detailed output
-            print(f"\n{'─'*60}")
-            print(f"  [{i}/{total}] {task.task_id}  (difficulty {task.difficulty})")
-            print(f"{'─'*60}")
-        else:
-            # Non-verbose: print task name, dots will follow from agent
-            label = f"  [{i:>{len(str(total))}}/{total}] {task.task_id}"
-            print(f"{label} ", end="", flush=True)
-
-        try:
-            metrics, score_result = run_single_task(task, config, langfuse_client=langfuse_client)
-            all_metrics.append(metrics)
-            all_scores.append(score_result)
-
-            if config.verbose:
-                print(
-                    f"\n  Score: {metrics.score:.4f}  "
-                    f"({metrics.tool_calls_total} calls, "
-                    f"{metrics.wall_time_seconds:.1f}s, "
-                    f"{metrics.total_tokens:,} tokens)"
-                )
-            else:
-                # Complete the line after dots
+    if config.reuse_task_results:
+        print(f"  Reusing scored results from {config.task_cache_dir}")
+    tool_cache = ToolCache(config.tool_cache_dir) if config.enable_tool_cache else None
+
+    workers = min(config.max_parallel_tasks, total)
+    if workers > 1:
+        # Tasks are independent and dominated by API latency. Per-step output
+        # would interleave, so each task reports one line when it finishes.
+        print(f"  Running up to {workers} tasks in parallel")
+        results: list[tuple[TaskMetrics, dict] | None] = [None] * total
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    run_single_task, task, config,
+                    langfuse_client=langfuse_client, tool_cache=tool_cache, quiet=True,
+                ): i
+                for i, task in enumerate(tasks)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                task = tasks[futures[future]]
+                label = f"  [{done:>{len(str(total))}}/{total}] {task.task_id}"
+                try:
+                    result = future.result()
+                except Exception as e:
+                    _record_task_failure(task, e, config, langfuse_client)
+                    print(f"{label} FAILED: {e}" if config.verbose else f"{label} FAILED")
+                    continue
+                results[futures[future]] = result
+                metrics = result[0]
                 print(
-                    f" {metrics.score:.4f}  "
+                    f"{label} {metrics.score:.4f}  "
                     f"({metrics.tool_calls_total} calls, "
                     f"{metrics.wall_time_seconds:.1f}s)"
                 )
-        except Exception as e:
-            log.error("Task %s failed: %s", task.task_id, e, exc_info=True)
-            if config.langfuse_enabled:
-                langfuse_client.create_event(
-                    trace_id=None,
-                    name="task_failed_unhandled",
-                    output={"task_id": task.task_id, "error": str(e)},
-                    level="ERROR",
-                )
+        # Keep reports in manifest order regardless of completion order
+        for result in results:
+            if result is not None:
+                all_metrics.append(result[0])
+                all_scores.append(result[1])
+    else:
+        for i, task in enumerate(tasks, 1):
             if config.verbose:
-                print(f"\n  FAILED: {e}")
+                # Verbose: full header, agent prints detailed output
+                print(f"\n{'─'*60}")
+                print(f"  [{i}/{total}] {task.task_id}  (difficulty {task.difficulty})")
+                print(f"{'─'*60}")
             else:
-                print(f" FAILED")
-            continue
+                # Non-verbose: print task name, dots will follow from agent
+                label = f"  [{i:>{len(str(total))}}/{total}] {task.task_id}"
+                print(f"{label} ", end="", flush=True)
+
+            try:
+                metrics, score_result = run_single_task(
+                    task, config, langfuse_client=langfuse_client, tool_cache=tool_cache,
+                )
+                all_metrics.append(metrics)
+                all_scores.append(score_result)
+
+                if config.verbose:
+                    print(
+                        f"\n  Score: {metrics.score:.4f}  "
+                        f"({metrics.tool_calls_total} calls, "
+                        f"{metrics.wall_time_seconds:.1f}s, "
+                        f"{metrics.total_tokens:,} tokens)"
+                    )
+                else:
+                    # Complete the line after dots
+                    print(
+                        f" {metrics.score:.4f}  "
+                        f"({metrics.tool_calls_total} calls, "
+                        f"{metrics.wall_time_seconds:.1f}s)"
+                    )
+            except Exception as e:
+                _record_task_failure(task, e, config, langfuse_client)
+                if config.verbose:
+                    print(f"\n  FAILED: {e}")
+                else:
+                    print(f" FAILED")
+                continue
+
+    # Deliver trace events still queued for Langfuse ingestion
+    langfuse_client.flush()
 
     # Compute aggregate metrics
     aggregate = compute_aggregate(all_metrics)
 
     # Print summary via scorer
-    sys.path.insert(0, str(config.project_root))
-    from scorer import print_summary
-
-    print_summary(all_scores)
+    _import_scorer(config.project_root).print_summary(all_scores)
 
     # Save benchmark report
     config.results_dir.mkdir(parents=True, exist_ok=True)
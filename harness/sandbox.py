@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import functools
+import json
 import logging
+import os
+import selectors
 import subprocess
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -17,23 +23,156 @@ class RunResult:
     timed_out: bool = False
 
 
+@functools.lru_cache(maxsize=None)
+def docker_image_id(image: str) -> str:
+    """
+    Content ID of a local Docker image, looked up once per process.
+
+    Falls back to the image name if docker can't resolve it, so callers
+    still get a stable (if less precise) identity.
+    """
+    try:
+        proc = subprocess.run(
+            ["docker", "image", "inspect", "--format", "{{.Id}}", image],
+            capture_output=True, text=True, timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        log.warning("Could not inspect Docker image %s: %s", image, e)
+        return image
+    if proc.returncode != 0 or not proc.stdout.strip():
+        log.warning("Could not inspect Docker image %s: %s", image, proc.stderr.strip())
+        return image
+    return proc.stdout.strip()
+
+
+def _container_gone(result: RunResult) -> bool:
+    """Whether a docker exec failed because its container no longer runs."""
+    if result.returncode == 0 or not result.stderr.startswith("Error response from daemon:"):
+        return False
+    message = result.stderr.lower()
+    return "no such container" in message or "is not running" in message
+
+
+def _decode_output(data: bytes | bytearray) -> str:
+    # Same result as subprocess's text mode (universal newlines), minus the
+    # strict decoding that would fail on binary tool output
+    text = data.decode("utf-8", errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _run_capped(
+    cmd: list[str],
+    timeout: float,
+    max_output_chars: int,
+    cwd: str | None = None,
+) -> RunResult:
+    """
+    Run cmd like ``subprocess.run(capture_output=True, timeout=...)``, but
+    keep only as much of stdout/stderr as can fill max_output_chars.
+
+    Output past the cap is drained and discarded, so a tool dumping hundreds
+    of MB never holds more than a few KB in memory and still exits normally.
+    """
+    # Enough bytes for max_output_chars + 1 characters of UTF-8
+    byte_limit = 4 * max_output_chars + 4
+    timed_out = False
+    deadline = time.monotonic() + timeout
+
+    # close_fds=False skips closing every descriptor in the child: Python
+    # creates its descriptors non-inheritable (PEP 446), so none would leak
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        close_fds=False,
+    ) as proc:
+        captured = {proc.stdout: bytearray(), proc.stderr: bytearray()}
+        with selectors.DefaultSelector() as selector:
+            for pipe in captured:
+                selector.register(pipe, selectors.EVENT_READ)
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                for key, _ in selector.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        continue
+                    buf = captured[key.fileobj]
+                    if len(buf) < byte_limit:
+                        buf += chunk[: byte_limit - len(buf)]
+
+        if not timed_out:
+            try:
+                proc.wait(timeout=max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                timed_out = True
+        if timed_out:
+            proc.kill()
+            proc.wait()
+
+        stdout = _decode_output(captured[proc.stdout])
+        stderr = _decode_output(captured[proc.stderr])
+        returncode = -1 if timed_out else proc.returncode
+
+    return capped_result(stdout, stderr, returncode, max_output_chars, timed_out=timed_out)
+
+
+def capped_result(
+    stdout: str,
+    stderr: str,
+    returncode: int,
+    max_output_chars: int,
+    timed_out: bool = False,
+) -> RunResult:
+    """Build a RunResult, truncating each stream to max_output_chars."""
+    truncated = False
+    if len(stdout) > max_output_chars:
+        stdout = stdout[:max_output_chars] + "\n... [output truncated]"
+        truncated = True
+    if len(stderr) > max_output_chars:
+        stderr = stderr[:max_output_chars] + "\n... [output truncated]"
+        truncated = True
+
+    return RunResult(
+        stdout=stdout,
+        stderr=stderr,
+        returncode=returncode,
+        truncated=truncated,
+        timed_out=timed_out,
+    )
+
+
 class PathValidator:
     def __init__(self, workspace_dir: Path):
         self.workspace_dir = workspace_dir.resolve()
+        self._workspace_str = str(self.workspace_dir)
+        self._workspace_prefix = os.path.join(self._workspace_str, "")
+
+    def _contains(self, resolved: str) -> bool:
+        # Compare against "<workspace>/" so a sibling like "<workspace>2" is rejected
+        return resolved == self._workspace_str or resolved.startswith(self._workspace_prefix)
 
     def validate(self, path_str: str) -> Path:
-        path = (self.workspace_dir / path_str).resolve()
+        # realpath resolves every symlink component, so the containment check
+        # must stay on the fully resolved path
+        resolved = os.path.realpath(os.path.join(self._workspace_str, path_str))
 
-        if not str(path).startswith(str(self.workspace_dir)):
+        if not self._contains(resolved):
             raise ValueError(
                 f"Path escapes workspace: {path_str!r} "
                 f"resolves outside {self.workspace_dir}"
             )
 
+        path = Path(resolved)
+
         # Reject symlinks pointing outside workspace
         if path.is_symlink():
             target = path.resolve()
-            if not str(target).startswith(str(self.workspace_dir)):
+            if not self._contains(str(target)):
                 raise ValueError(
                     f"Symlink {path_str!r} points outside workspace: {target}"
                 )
@@ -45,21 +184,42 @@ class PathValidator:
 
 
 class DockerRunner:
+    """Run tool commands inside the sandbox image.
+
+    With reuse_container=True (the default) a single container is started
+    on first use and every command is a ``docker exec`` into it, avoiding
+    per-call container startup. Call close() to stop it.
+    """
+
     def __init__(
         self,
         image: str,
         workspace_dir: Path,
         timeout: int = 30,
         max_output_chars: int = 8000,
+        reuse_container: bool = True,
+        max_lifetime: int | None = None,
     ):
         self.image = image
         self.workspace_dir = workspace_dir.resolve()
         self.timeout = timeout
         self.max_output_chars = max_output_chars
+        self.reuse_container = reuse_container
+        # Seconds the reusable container lives (None: until close()). If the
+        # harness dies without calling close(), --rm never fires; the bound
+        # stops such containers from idling forever
+        self.max_lifetime = max_lifetime
+        self._container_id: str | None = None
+        self._container_lock = threading.Lock()
+        # Long-lived python3 in the container; see run_worker()
+        self._worker: subprocess.Popen | None = None
+        self._worker_pid: int | None = None
+        self._worker_buf = bytearray()
+        self._worker_failed = False
+        self._worker_lock = threading.Lock()
 
-    def run(self, command: list[str]) -> RunResult:
-        docker_cmd = [
-            "docker", "run", "--rm",
+    def _sandbox_args(self) -> list[str]:
+        return [
             "--platform", "linux/amd64",
             "--network=none",
             "--read-only",
@@ -67,45 +227,210 @@ class DockerRunner:
             f"--cpus=1",
             "-v", f"{self.workspace_dir}:/workspace:ro",
             "-w", "/workspace",
-            self.image,
-        ] + command
+        ]
 
-        log.debug("Docker command: %s", " ".join(docker_cmd))
-        return self._exec(docker_cmd)
+    def _ensure_container(self) -> str | None:
+        with self._container_lock:
+            if self._container_id is None and self.reuse_container:
+                cmd = [
+                    "docker", "run", "-d", "--rm",
+                    "--label", "agentre-bench=tools",
+                    *self._sandbox_args(),
+                    "--entrypoint", "sleep",
+                    self.image,
+                    str(self.max_lifetime) if self.max_lifetime else "infinity",
+                ]
+                try:
+                    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+                except (OSError, subprocess.TimeoutExpired) as e:
+                    proc = None
+                    error = str(e)
+                else:
+                    error = proc.stderr.strip()
+                if proc is not None and proc.returncode == 0 and proc.stdout.strip():
+                    self._container_id = proc.stdout.strip()
+                    log.debug("Started tool container %s", self._container_id[:12])
+                else:
+                    # Fall back to one container per call for this runner
+                    log.warning("Could not start reusable tool container: %s", error)
+                    self.reuse_container = False
+            return self._container_id
 
-    def _exec(self, cmd: list[str]) -> RunResult:
-        timed_out = False
+    def close(self) -> None:
+        with self._worker_lock:
+            # The container is about to be killed, taking the worker with it
+            self._stop_worker(kill_in_container=False)
+        with self._container_lock:
+            container_id, self._container_id = self._container_id, None
+        if container_id:
+            try:
+                subprocess.run(
+                    ["docker", "kill", container_id],
+                    capture_output=True, timeout=30,
+                )
+            except (OSError, subprocess.TimeoutExpired) as e:
+                log.warning("Failed to stop tool container %s: %s", container_id[:12], e)
+
+    def run(self, command: list[str]) -> RunResult:
+        container_id = self._ensure_container()
+        result = self._run_in(container_id, command)
+        if container_id and _container_gone(result):
+            # Outlived max_lifetime or was killed from outside; start a
+            # fresh container rather than failing every remaining call
+            log.warning("Tool container %s is gone; starting a new one", container_id[:12])
+            self._forget_container(container_id)
+            result = self._run_in(self._ensure_container(), command)
+        return result
+
+    def _forget_container(self, container_id: str) -> None:
+        with self._container_lock:
+            if self._container_id == container_id:
+                self._container_id = None
+
+    def _run_in(self, container_id: str | None, command: list[str]) -> RunResult:
+        if container_id:
+            # Enforce the timeout inside the container: killing the docker
+            # client alone would leave the tool running in the shared container
+            docker_cmd = [
+                "docker", "exec", "-w", "/workspace", container_id,
+                "timeout", "-k", "5", str(self.timeout),
+            ] + command
+        else:
+            docker_cmd = [
+                "docker", "run", "--rm",
+                *self._sandbox_args(),
+                self.image,
+            ] + command
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Docker command: %s", " ".join(docker_cmd))
+        result = self._exec(docker_cmd, client_timeout=self.timeout + 10 if container_id else None)
+        if container_id and result.returncode == 124:
+            # Exit status of coreutils timeout when the limit is hit
+            result.timed_out = True
+        return result
+
+    def _exec(self, cmd: list[str], client_timeout: int | None = None) -> RunResult:
+        return _run_capped(cmd, client_timeout or self.timeout, self.max_output_chars)
+
+    def run_worker(self, script: str, init: dict, request: dict) -> RunResult | None:
+        """
+        Answer one request from a long-lived python3 worker in the container.
+
+        The worker is started on first use as ``python3 -c script`` and sent
+        ``init`` as its first line (protocol in harness/tool_worker.py).
+        Returns None when no worker is available, in which case the caller
+        should fall back to run().
+        """
+        container_id = self._ensure_container()
+        if not container_id:
+            return None
+
+        with self._worker_lock:
+            if self._worker is None:
+                if self._worker_failed or not self._start_worker(container_id, script, init):
+                    self._worker_failed = True
+                    return None
+
+            payload = dict(request, max_chars=self.max_output_chars)
+            try:
+                self._worker.stdin.write(json.dumps(payload).encode() + b"\n")
+                line = self._read_worker_line(time.monotonic() + self.timeout)
+            except TimeoutError:
+                # Kill it in the container too, or it keeps the CPU busy
+                self._stop_worker(kill_in_container=True)
+                return capped_result("", "", -1, self.max_output_chars, timed_out=True)
+            except OSError:
+                line = None
+            if line is None:
+                log.warning("Tool worker exited; falling back to docker exec")
+                self._stop_worker(kill_in_container=False)
+                return None
+            try:
+                reply = json.loads(line)
+                output = (reply["stdout"], reply["stderr"], reply["returncode"])
+            except (ValueError, KeyError, TypeError):
+                # Stray output or a traceback: the stream is out of sync
+                log.warning("Tool worker sent an invalid reply; falling back to docker exec")
+                self._stop_worker(kill_in_container=True)
+                return None
+
+        return capped_result(*output, self.max_output_chars)
+
+    def _start_worker(self, container_id: str, script: str, init: dict) -> bool:
+        cmd = [
+            "docker", "exec", "-i", "-w", "/workspace", container_id,
+            "python3", "-c", script,
+        ]
         try:
-            proc = subprocess.run(
+            self._worker = subprocess.Popen(
                 cmd,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0,
             )
-            stdout = proc.stdout
-            stderr = proc.stderr
-            returncode = proc.returncode
-        except subprocess.TimeoutExpired as e:
-            stdout = (e.stdout or b"").decode("utf-8", errors="replace")
-            stderr = (e.stderr or b"").decode("utf-8", errors="replace")
-            returncode = -1
-            timed_out = True
-
-        truncated = False
-        if len(stdout) > self.max_output_chars:
-            stdout = stdout[: self.max_output_chars] + "\n... [output truncated]"
-            truncated = True
-        if len(stderr) > self.max_output_chars:
-            stderr = stderr[: self.max_output_chars] + "\n... [output truncated]"
-            truncated = True
-
-        return RunResult(
-            stdout=stdout,
-            stderr=stderr,
-            returncode=returncode,
-            truncated=truncated,
-            timed_out=timed_out,
-        )
+        except OSError as e:
+            log.warning("Could not start tool worker: %s", e)
+            return False
+        self._worker_buf = bytearray()
+
+        hello = None
+        try:
+            self._worker.stdin.write(json.dumps(init).encode() + b"\n")
+            line = self._read_worker_line(time.monotonic() + 60)
+            hello = json.loads(line) if line else None
+        except (OSError, TimeoutError, ValueError):
+            pass
+        if not isinstance(hello, dict) or "pid" not in hello:
+            log.warning("Could not start tool worker; using docker exec per call")
+            self._stop_worker(kill_in_container=False)
+            return False
+        self._worker_pid = hello["pid"]
+        log.debug("Started tool worker (pid %s in %s)", self._worker_pid, container_id[:12])
+        return True
+
+    def _read_worker_line(self, deadline: float) -> bytes | None:
+        """Next line from the worker; None at EOF, TimeoutError past deadline."""
+        buf = self._worker_buf
+        fd = self._worker.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while True:
+                end = buf.find(b"\n")
+                if end >= 0:
+                    line = bytes(buf[:end])
+                    del buf[:end + 1]
+                    return line
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError
+                if not selector.select(remaining):
+                    continue
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    return None
+                buf += chunk
+
+    def _stop_worker(self, kill_in_container: bool) -> None:
+        proc, self._worker = self._worker, None
+        pid, self._worker_pid = self._worker_pid, None
+        if proc is None:
+            return
+        # Killing the docker exec client does not stop the process it started
+        container_id = self._container_id
+        if kill_in_container and pid and container_id:
+            try:
+                subprocess.run(
+                    ["docker", "exec", container_id, "sh", "-c", f"kill -9 {int(pid)}"],
+                    capture_output=True, timeout=30,
+                )
+            except (OSError, subprocess.TimeoutExpired) as e:
+                log.warning("Failed to stop tool worker %s: %s", pid, e)
+        proc.kill()
+        proc.wait()
+        proc.stdin.close()
+        proc.stdout.close()
 
 
 class SubprocessRunner:
@@ -119,44 +444,22 @@ class SubprocessRunner:
         self.timeout = timeout
         self.max_output_chars = max_output_chars
 
+    def close(self) -> None:
+        return None
+
     def run(self, command: list[str]) -> RunResult:
-        log.debug("Subprocess command: %s", " ".join(command))
-        timed_out = False
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Subprocess command: %s", " ".join(command))
         try:
-            proc = subprocess.run(
+            return _run_capped(
                 command,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout,
+                self.timeout,
+                self.max_output_chars,
                 cwd=str(self.workspace_dir),
             )
-            stdout = proc.stdout
-            stderr = proc.stderr
-            returncode = proc.returncode
-        except subprocess.TimeoutExpired as e:
-            stdout = (e.stdout or b"").decode("utf-8", errors="replace")
-            stderr = (e.stderr or b"").decode("utf-8", errors="replace")
-            returncode = -1
-            timed_out = True
         except FileNotFoundError:
             return RunResult(
                 stdout="",
                 stderr=f"Command not found: {command[0]}",
                 returncode=127,
             )
-
-        truncated = False
-        if len(stdout) > self.max_output_chars:
-            stdout = stdout[: self.max_output_chars] + "\n... [output truncated]"
-            truncated = True
-        if len(stderr) > self.max_output_chars:
-            stderr = stderr[: self.max_output_chars] + "\n... [output truncated]"
-            truncated = True
-
-        return RunResult(
-            stdout=stdout,
-            stderr=stderr,
-            returncode=returncode,
-            truncated=truncated,
-            timed_out=timed_out,
-        )
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), default=str)
+
+
+def canonical_json(obj: Any) -> str:
+    return _CANONICAL_ENCODER.encode(obj)
+
+
+class ToolCache:
+    """Two-tier (in-memory LRU + on-disk JSON) cache of tool results.
+
+    Entries are keyed by the tool name, its canonicalized input, the task
+    binary's mtime, the tool environment and output cap (both change what
+    a tool prints) and the stat of the file the input names, so a rebuilt
+    or replaced file, or a rebuilt tool image, never hits a stale entry.
+    Host tools in local mode have no such identity; clear the cache after
+    upgrading them. Only successful results
+    should be stored; see ToolExecutor.execute. Safe to share between the
+    threads that execute one turn's tool calls.
+    """
+
+    def __init__(self, cache_dir: Path | None = None, max_entries: int = 512):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        tool_name: str,
+        tool_input: dict[str, Any],
+        binary_mtime_ns: int,
+        *,
+        environment: str,
+        max_output_chars: int,
+        target: tuple[str, int, int],
+    ) -> str:
+        """
+        environment identifies where tools run ("local", or the Docker
+        image ID); target is the (path, st_mtime_ns, st_size) of the file
+        the input names.
+        """
+        canonical = "\0".join((
+            tool_name,
+            canonical_json(tool_input),
+            str(binary_mtime_ns),
+            environment,
+            str(max_output_chars),
+            canonical_json(target),
+        ))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(result)
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, result)
+        return dict(result)
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        with self._lock:
+            self._remember(key, dict(result))
+        self._write_disk(key, result)
+
+    def _remember(self, key: str, result: dict[str, Any]) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, key: str) -> dict[str, Any] | None:
+        if self.cache_dir is None:
+            return None
+        path = self.cache_dir / f"{key}.json"
+        try:
+            return json.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring unreadable tool cache entry %s: %s", path, e)
+            return None
+
+    def _write_disk(self, key: str, result: dict[str, Any]) -> None:
+        if self.cache_dir is None:
+            return
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(result))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log.warning("Failed to write tool cache entry %s: %s", path, e)
+            tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,56 @@
+"""
+Long-lived Python worker for the ``entropy`` and ``pefile`` tools.
+
+Runs inside the tool container via ``python3 -c`` (see
+DockerRunner.run_worker) so each call skips interpreter startup and the
+pefile import, and parsed PE files are reused across calls. Standalone
+and stdlib-only like the tool modules it hosts.
+
+Protocol, one JSON object per line:
+  - first stdin line: {"<module name>": "<module source>", ...}; the worker
+    replies {"pid": <pid>} once they are loaded
+  - then requests {"tool": ..., "argv": [...], "max_chars": N}, each
+    answered with {"stdout": ..., "stderr": ..., "returncode": ...}
+"""
+import json
+import os
+import sys
+import types
+
+
+def load_modules(sources):
+    modules = {}
+    for name, source in sources.items():
+        module = types.ModuleType(name)
+        exec(compile(source, f"{name}.py", "exec"), module.__dict__)
+        modules[name] = module
+    return modules
+
+
+def serve(stdin, stdout):
+    modules = load_modules(json.loads(stdin.readline()))
+    pe_cache = {}
+
+    def reply(obj):
+        stdout.write(json.dumps(obj) + "\n")
+        stdout.flush()
+
+    reply({"pid": os.getpid()})
+    for line in stdin:
+        request = json.loads(line)
+        tool = request.get("tool")
+        if tool == "entropy":
+            out, err, rc = modules["entropy"].run(request["argv"])
+        elif tool == "pefile":
+            out, err, rc = modules["pe_report"].run(request["argv"], cache=pe_cache)
+        else:
+            out, err, rc = "", f"Unknown worker tool: {tool!r}\n", 2
+        # One char past the cap is enough for the caller to mark truncation
+        limit = request.get("max_chars")
+        if limit is not None:
+            out, err = out[:limit + 1], err[:limit + 1]
+        reply({"stdout": out, "stderr": err, "returncode": rc})
+
+
+if __name__ == "__main__":
+    serve(sys.stdin, sys.stdout)
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
+import functools
 import logging
+import threading
 from pathlib import Path
-from typing import Any
-
-from .config import BenchmarkConfig
-from .sandbox import DockerRunner, PathValidator, RunResult, SubprocessRunner
+from typing import Any, Callable
+
+from . import entropy as _entropy
+from . import native_tools as _native_tools
+from . import pe_report as _pe_report
+from .config import CACHEABLE_TOOLS, BenchmarkConfig
+from .sandbox import (
+    DockerRunner,
+    PathValidator,
+    RunResult,
+    SubprocessRunner,
+    capped_result,
+    docker_image_id,
+)
+from .tool_cache import ToolCache
 
 log = logging.getLogger(__name__)
 
@@ -269,124 +282,170 @@ TOOL_SCHEMAS = [
 
 # ── Entropy computation script (runs inside sandbox via python3 -c) ───
 
-ENTROPY_SCRIPT = r'''
-import math, struct, sys, os
+# Source of harness/entropy.py; local runs call entropy.run() in-process instead
+ENTROPY_SCRIPT = Path(_entropy.__file__).read_text()
+PEFILE_SCRIPT = Path(_pe_report.__file__).read_text()
+# Persistent in-container interpreter for the two Python-backed tools
+TOOL_WORKER_SCRIPT = Path(__file__).with_name("tool_worker.py").read_text()
+TOOL_WORKER_MODULES = {"entropy": ENTROPY_SCRIPT, "pe_report": PEFILE_SCRIPT}
+
+# Accepted values for the tools' "flags" argument
+_READELF_FLAGS = frozenset({"-h", "-S", "-s", "-l", "-d", "-a"})
+_OBJDUMP_FLAGS = frozenset({"-d", "-D", "-t", "-x", "-s"})
+_PEFILE_FLAGS = frozenset(_pe_report.FLAGS)
+
+
+def _checked_flag(tool_name: str, flags: Any, allowed: frozenset[str]) -> str:
+    # Set lookup hashes the value, and the model may send any JSON type
+    if not isinstance(flags, str) or flags not in allowed:
+        raise ValueError(f"Invalid {tool_name} flag: {flags!r}")
+    return flags
+
+
+# ── Command builders ──────────────────────────────────────────────────
+# Each takes the validated path and the tool's arguments and returns argv.
+
+def _file_command(path: str, args: dict[str, Any]) -> list[str]:
+    return ["file", path]
+
+
+def _strings_command(path: str, args: dict[str, Any]) -> list[str]:
+    cmd = ["strings"]
+    ml = args.get("min_length")
+    if ml is not None:
+        cmd += ["-n", str(int(ml))]
+    cmd.append(path)
+    return cmd
+
+
+def _readelf_command(path: str, args: dict[str, Any]) -> list[str]:
+    flags = _checked_flag("readelf", args.get("flags", "-h"), _READELF_FLAGS)
+    return ["readelf", flags, path]
+
+
+def _objdump_command(path: str, args: dict[str, Any]) -> list[str]:
+    flags = _checked_flag("objdump", args.get("flags", "-d"), _OBJDUMP_FLAGS)
+    cmd = ["objdump", flags]
+    section = args.get("section")
+    if section:
+        cmd += ["-j", str(section)]
+    cmd.append(path)
+    return cmd
+
+
+def _nm_command(path: str, args: dict[str, Any]) -> list[str]:
+    return ["nm", path]
 
-def entropy(data, window=256):
-    results = []
-    for i in range(0, len(data), window):
-        chunk = data[i:i+window]
-        if len(chunk) < 16:
-            break
-        freq = [0]*256
-        for b in chunk:
-            freq[b] += 1
-        n = len(chunk)
-        ent = 0.0
-        for f in freq:
-            if f > 0:
-                p = f / n
-                ent -= p * math.log2(p)
-        results.append((i, len(chunk), round(ent, 4)))
-    return results
-
-path = sys.argv[1]
-section = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] != "" else None
-window = int(sys.argv[3]) if len(sys.argv) > 3 else 256
-
-with open(path, "rb") as f:
-    data = f.read()
-
-if section:
-    # Parse ELF section headers to find the section
-    if data[:4] != b"\x7fELF":
-        print(f"Error: not an ELF file", file=sys.stderr)
-        sys.exit(1)
-    is_64 = data[4] == 2
-    if is_64:
-        e_shoff = struct.unpack_from("<Q", data, 40)[0]
-        e_shentsize = struct.unpack_from("<H", data, 58)[0]
-        e_shnum = struct.unpack_from("<H", data, 60)[0]
-        e_shstrndx = struct.unpack_from("<H", data, 62)[0]
-        # Get section name string table
-        str_sh_off = e_shoff + e_shstrndx * e_shentsize
-        str_sh_offset = struct.unpack_from("<Q", data, str_sh_off + 24)[0]
-        str_sh_size = struct.unpack_from("<Q", data, str_sh_off + 32)[0]
-        strtab = data[str_sh_offset:str_sh_offset+str_sh_size]
-        found = False
-        for i in range(e_shnum):
-            off = e_shoff + i * e_shentsize
-            sh_name_idx = struct.unpack_from("<I", data, off)[0]
-            name = strtab[sh_name_idx:].split(b"\x00")[0].decode("ascii", errors="replace")
-            if name == section:
-                sh_offset = struct.unpack_from("<Q", data, off + 24)[0]
-                sh_size = struct.unpack_from("<Q", data, off + 32)[0]
-                data = data[sh_offset:sh_offset+sh_size]
-                found = True
-                break
-        if not found:
-            print(f"Section {section!r} not found", file=sys.stderr)
-            sys.exit(1)
-    else:
-        print("Only ELF64 supported for section targeting", file=sys.stderr)
-        sys.exit(1)
-
-results = entropy(data, window)
-total_ent = 0.0
-if data:
-    freq = [0]*256
-    for b in data:
-        freq[b] += 1
-    n = len(data)
-    for f in freq:
-        if f > 0:
-            p = f / n
-            total_ent -= p * math.log2(p)
-
-print(f"Total size: {len(data)} bytes")
-print(f"Overall entropy: {total_ent:.4f} bits/byte")
-print(f"Window size: {window} bytes")
-print(f"Windows analyzed: {len(results)}")
-print()
-if results:
-    ents = [r[2] for r in results]
-    print(f"Min window entropy: {min(ents):.4f}")
-    print(f"Max window entropy: {max(ents):.4f}")
-    print(f"Avg window entropy: {sum(ents)/len(ents):.4f}")
-    print()
-    print("Offset      Size  Entropy")
-    print("-" * 35)
-    for offset, size, ent in results[:50]:
-        bar = "#" * int(ent * 4)
-        print(f"0x{offset:08x}  {size:4d}  {ent:.4f}  {bar}")
-    if len(results) > 50:
-        print(f"... ({len(results) - 50} more windows)")
-'''
+
+def _hexdump_command(path: str, args: dict[str, Any]) -> list[str]:
+    offset = args.get("offset", 0)
+    length = min(int(args.get("length", 256)), 4096)
+    return ["hexdump", "-C", "-s", str(int(offset)), "-n", str(length), path]
+
+
+def _xxd_command(path: str, args: dict[str, Any]) -> list[str]:
+    offset = args.get("offset", 0)
+    length = min(int(args.get("length", 256)), 4096)
+    return ["xxd", "-s", str(int(offset)), "-l", str(length), path]
+
+
+def _entropy_command(path: str, args: dict[str, Any]) -> list[str]:
+    section = args.get("section", "")
+    window = str(args.get("window_size", 256))
+    # Arguments after the script are also entropy.run()'s argv
+    return [
+        "python3", "-c", ENTROPY_SCRIPT,
+        path, section, window,
+    ]
+
+
+def _pefile_command(path: str, args: dict[str, Any]) -> list[str]:
+    flags = _checked_flag("pefile", args.get("flags", "headers"), _PEFILE_FLAGS)
+    # Arguments after the script are also pe_report.run()'s argv
+    return ["python3", "-c", PEFILE_SCRIPT, path, flags]
+
+
+_COMMAND_BUILDERS: dict[str, Callable[[str, dict[str, Any]], list[str]]] = {
+    "file": _file_command,
+    "strings": _strings_command,
+    "readelf": _readelf_command,
+    "objdump": _objdump_command,
+    "nm": _nm_command,
+    "hexdump": _hexdump_command,
+    "xxd": _xxd_command,
+    "entropy": _entropy_command,
+    "pefile": _pefile_command,
+}
 
 
 # ── Tool execution ────────────────────────────────────────────────────
 
 class ToolExecutor:
-    def __init__(self, config: BenchmarkConfig, binary_path: Path):
+    def __init__(
+        self,
+        config: BenchmarkConfig,
+        binary_path: Path,
+        cache: ToolCache | None = None,
+    ):
         self.config = config
         self.binary_path = binary_path.resolve()
         self.validator = PathValidator(config.workspace_dir)
+        self.cache = cache
+        self._allowed_tools = frozenset(config.allowed_tools)
+        # (command path, host path) by workspace-relative argument; the
+        # agent's tools only read the workspace, so a path that passed
+        # stays valid
+        self._resolved_paths: dict[str, tuple[str, Path]] = {}
+        # Parsed PE files reused across local pefile calls; see pe_report.run
+        self._pe_cache: dict[tuple[str, int, int], Any] = {}
+        self._pe_lock = threading.Lock()
+        try:
+            self._binary_mtime_ns = self.binary_path.stat().st_mtime_ns
+        except OSError:
+            self._binary_mtime_ns = 0
 
         if config.use_docker:
+            # Tool output depends on the image's binutils/file/pefile
+            self._tool_environment = (
+                f"docker:{docker_image_id(config.docker_image)}" if cache is not None else ""
+            )
             self.runner = DockerRunner(
                 image=config.docker_image,
                 workspace_dir=config.workspace_dir,
                 timeout=config.tool_timeout_seconds,
                 max_output_chars=config.max_output_chars,
+                reuse_container=config.reuse_tool_container,
+                # Every tool call at its full timeout, plus an hour for the
+                # model's own turns
+                max_lifetime=config.max_tool_calls * (config.tool_timeout_seconds + 10) + 3600,
             )
         else:
+            self._tool_environment = "local"
             self.runner = SubprocessRunner(
                 workspace_dir=config.workspace_dir,
                 timeout=config.tool_timeout_seconds,
                 max_output_chars=config.max_output_chars,
             )
 
+    def close(self) -> None:
+        """Release sandbox resources (the reusable Docker container, if any)."""
+        self.runner.close()
+        with self._pe_lock:
+            for pe in self._pe_cache.values():
+                pe.close()
+            self._pe_cache.clear()
+
+    def __enter__(self) -> ToolExecutor:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def _resolve_path(self, path_arg: str) -> str:
+        return self._resolve(path_arg)[0]
+
+    def _resolve(self, path_arg: str) -> tuple[str, Path]:
+        """(path as the tool command sees it, validated host path)."""
         # The agent may send paths like "/workspace/binary" (Docker-style)
         # or just "binary". Strip the /workspace/ prefix before validating
         # against the real workspace directory.
@@ -396,16 +455,21 @@ class ToolExecutor:
         elif clean.startswith("/workspace"):
             clean = clean[len("/workspace"):]
 
-        validated = self.validator.validate(clean)
-        if self.config.use_docker:
-            return "/workspace/" + str(validated.relative_to(self.config.workspace_dir))
-        return str(validated)
+        resolved = self._resolved_paths.get(clean)
+        if resolved is None:
+            validated = self.validator.validate(clean)
+            if self.config.use_docker:
+                command_path = "/workspace/" + str(validated.relative_to(self.config.workspace_dir))
+            else:
+                command_path = str(validated)
+            resolved = self._resolved_paths[clean] = (command_path, validated)
+        return resolved
 
     def execute(self, tool_name: str, tool_input: dict[str, Any]) -> dict[str, Any]:
         if tool_name == "final_answer":
             return {"is_final_answer": True, "answer": tool_input}
 
-        if tool_name not in self.config.allowed_tools:
+        if tool_name not in self._allowed_tools:
             return {
                 "is_final_answer": False,
                 "error": f"Tool {tool_name!r} is not allowed.",
@@ -416,117 +480,71 @@ class ToolExecutor:
         except (ValueError, FileNotFoundError) as e:
             return {"is_final_answer": False, "error": str(e)}
 
-        result = self.runner.run(cmd)
-        return self._format_result(result)
+        cache_key = None
+        if self.cache is not None and tool_name in CACHEABLE_TOOLS:
+            cache_key = self._cache_key(tool_name, tool_input)
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                return cached
+
+        if tool_name == "entropy" and not self.config.use_docker:
+            # Nothing to isolate locally; skip starting an interpreter per call
+            run_result = capped_result(*_entropy.run(cmd[3:]), self.config.max_output_chars)
+        elif tool_name == "pefile" and not self.config.use_docker:
+            # Parse each binary once and answer every flag from the same parse
+            with self._pe_lock:
+                output = _pe_report.run(cmd[3:], cache=self._pe_cache)
+            run_result = capped_result(*output, self.config.max_output_chars)
+        elif tool_name in _native_tools.TOOLS and not self.config.use_docker:
+            # Pure byte formatting; no need for a process unless the
+            # arguments are ones only the real tool handles
+            output = _native_tools.run(cmd, self.config.max_output_chars)
+            if output is not None:
+                run_result = capped_result(*output, self.config.max_output_chars)
+            else:
+                run_result = self.runner.run(cmd)
+        elif tool_name in ("entropy", "pefile"):
+            # Same argv as the python3 -c command, served by the container's
+            # worker; fall back to the one-off command without one
+            run_result = self.runner.run_worker(
+                TOOL_WORKER_SCRIPT,
+                TOOL_WORKER_MODULES,
+                {"tool": tool_name, "argv": cmd[3:]},
+            )
+            if run_result is None:
+                run_result = self.runner.run(cmd)
+        else:
+            run_result = self.runner.run(cmd)
+
+        result = self._format_result(run_result)
+        # Failures may come from the environment (missing tool, Docker
+        # errors) rather than the binary, so they are never replayed
+        if cache_key is not None and result["returncode"] == 0 and not result["timed_out"]:
+            self.cache.put(cache_key, result)
+        return result
+
+    def _cache_key(self, tool_name: str, tool_input: dict[str, Any]) -> str | None:
+        """Cache key for a call whose path already resolved; None if it can't be stat'ed."""
+        host_path = self._resolve(tool_input.get("path", ""))[1]
+        try:
+            st = host_path.stat()
+        except OSError:
+            return None
+        return ToolCache.make_key(
+            tool_name,
+            tool_input,
+            self._binary_mtime_ns,
+            environment=self._tool_environment,
+            max_output_chars=self.config.max_output_chars,
+            target=(str(host_path), st.st_mtime_ns, st.st_size),
+        )
 
     def _build_command(self, tool_name: str, args: dict[str, Any]) -> list[str]:
         path = self._resolve_path(args.get("path", ""))
-
-        if tool_name == "file":
-            return ["file", path]
-
-        if tool_name == "strings":
-            cmd = ["strings"]
-            ml = args.get("min_length")
-            if ml is not None:
-                cmd += ["-n", str(int(ml))]
-            cmd.append(path)
-            return cmd
-
-        if tool_name == "readelf":
-            flags = args.get("flags", "-h")
-            if flags not in ("-h", "-S", "-s", "-l", "-d", "-a"):
-                raise ValueError(f"Invalid readelf flag: {flags!r}")
-            return ["readelf", flags, path]
-
-        if tool_name == "objdump":
-            flags = args.get("flags", "-d")
-            if flags not in ("-d", "-D", "-t", "-x", "-s"):
-                raise ValueError(f"Invalid objdump flag: {flags!r}")
-            cmd = ["objdump", flags]
-            section = args.get("section")
-            if section:
-                cmd += ["-j", str(section)]
-            cmd.append(path)
-            return cmd
-
-        if tool_name == "nm":
-            return ["nm", path]
-
-        if tool_name == "hexdump":
-            offset = args.get("offset", 0)
-            length = min(int(args.get("length", 256)), 4096)
-            return ["hexdump", "-C", "-s", str(int(offset)), "-n", str(length), path]
-
-        if tool_name == "xxd":
-            offset = args.get("offset", 0)
-            length = min(int(args.get("length", 256)), 4096)
-            return ["xxd", "-s", str(int(offset)), "-l", str(length), path]
-
-        if tool_name == "entropy":
-            section = args.get("section", "")
-            window = str(args.get("window_size", 256))
-            return [
-                "python3", "-c", ENTROPY_SCRIPT,
-                path, section, window,
-            ]
-
-        if tool_name == "pefile":
-            flags = args.get("flags", "headers")
-
-            # Python script that uses pefile library
-            pefile_script = f"""
-import pefile
-import sys
-
-try:
-    pe = pefile.PE('{path}')
-
-    if '{flags}' == 'headers' or '{flags}' == 'all':
-        print("=== DOS HEADER ===")
-        print(pe.DOS_HEADER)
-        print("\\n=== NT HEADERS ===")
-        print(pe.NT_HEADERS)
-        print("\\n=== OPTIONAL HEADER ===")
-        print(pe.OPTIONAL_HEADER)
-
-    if '{flags}' == 'sections' or '{flags}' == 'all':
-        print("\\n=== SECTIONS ===")
-        for section in pe.sections:
-            print(f"{{section.Name.decode().rstrip(chr(0))}}:")
-            print(f"  Virtual Address: 0x{{section.VirtualAddress:x}}")
-            print(f"  Virtual Size: 0x{{section.Misc_VirtualSize:x}}")
-            print(f"  Raw Size: 0x{{section.SizeOfRawData:x}}")
-            print(f"  Characteristics: 0x{{section.Characteristics:x}}")
-
-    if '{flags}' == 'imports' or '{flags}' == 'all':
-        print("\\n=== IMPORTS ===")
-        if hasattr(pe, 'DIRECTORY_ENTRY_IMPORT'):
-            for entry in pe.DIRECTORY_ENTRY_IMPORT:
-                print(f"{{entry.dll.decode()}}:")
-                for imp in entry.imports:
-                    if imp.name:
-                        print(f"  {{imp.name.decode()}}")
-
-    if '{flags}' == 'exports' or '{flags}' == 'all':
-        print("\\n=== EXPORTS ===")
-        if hasattr(pe, 'DIRECTORY_ENTRY_EXPORT'):
-            for exp in pe.DIRECTORY_ENTRY_EXPORT.symbols:
-                print(f"  {{exp.name.decode() if exp.name else 'ordinal=' + str(exp.ordinal)}}")
-
-    if '{flags}' == 'resources' or '{flags}' == 'all':
-        print("\\n=== RESOURCES ===")
-        if hasattr(pe, 'DIRECTORY_ENTRY_RESOURCE'):
-            print("Resource directory present")
-
-    pe.close()
-except Exception as e:
-    print(f"Error: {{str(e)}}", file=sys.stderr)
-    sys.exit(1)
-"""
-            return ["python3", "-c", pefile_script]
-
-        raise ValueError(f"Unknown tool: {tool_name!r}")
+        builder = _COMMAND_BUILDERS.get(tool_name)
+        if builder is None:
+            raise ValueError(f"Unknown tool: {tool_name!r}")
+        return builder(path, args)
 
     def _format_result(self, result: RunResult) -> dict[str, Any]:
         output_parts = []
@@ -550,46 +568,49 @@ except Exception as e:
         }
 
 
-def get_tool_schemas(include_final_answer: bool = True) -> list[dict]:
+@functools.lru_cache(maxsize=4)
+def _tool_schemas(include_final_answer: bool) -> tuple[dict, ...]:
     if include_final_answer:
-        return list(TOOL_SCHEMAS)
-    return [t for t in TOOL_SCHEMAS if t["name"] != "final_answer"]
+        return tuple(TOOL_SCHEMAS)
+    return tuple(t for t in TOOL_SCHEMAS if t["name"] != "final_answer")
 
 
-def get_tool_schemas_for_format(file_type: str, include_final_answer: bool = True) -> list[dict]:
-    """
-    Return tool schemas appropriate for the given binary format.
+def get_tool_schemas(include_final_answer: bool = True) -> list[dict]:
+    return list(_tool_schemas(include_final_answer))
 
-    Args:
-        file_type: Binary format (e.g., "ELF64", "PE32", "Mach-O")
-        include_final_answer: Whether to include final_answer tool
 
-    Returns:
-        Filtered list of tool schemas
-    """
-    # Universal tools (work with all formats)
-    universal_tools = {"file", "strings", "hexdump", "xxd", "entropy", "final_answer"}
-
-    # Format-specific tools
-    format_specific = {
-        "ELF": {"readelf", "objdump", "nm"},
-        "ELF64": {"readelf", "objdump", "nm"},
-        "ELF32": {"readelf", "objdump", "nm"},
-        "Mach-O": {"nm"},  # nm works with MACHO; otool not available in Docker
-        "Mach-O 64-bit": {"nm"},
-        "PE32": {"pefile"},
-        "PE32+": {"pefile"},
-        "PE": {"pefile"},
-    }
+# Universal tools (work with all formats)
+_UNIVERSAL_TOOLS = frozenset({"file", "strings", "hexdump", "xxd", "entropy", "final_answer"})
+
+# Format-specific tools
+_FORMAT_SPECIFIC_TOOLS = {
+    "ELF": {"readelf", "objdump", "nm"},
+    "ELF64": {"readelf", "objdump", "nm"},
+    "ELF32": {"readelf", "objdump", "nm"},
+    "Mach-O": {"nm"},  # nm works with MACHO; otool not available in Docker
+    "Mach-O 64-bit": {"nm"},
+    "PE32": {"pefile"},
+    "PE32+": {"pefile"},
+    "PE": {"pefile"},
+}
+
+# (upper-cased prefix, tools) with the most specific prefix first
+_FORMAT_PREFIXES = tuple(sorted(
+    ((fmt.upper(), frozenset(tools)) for fmt, tools in _FORMAT_SPECIFIC_TOOLS.items()),
+    key=lambda item: -len(item[0]),
+))
 
+
+@functools.lru_cache(maxsize=None)
+def _tool_schemas_for_format(file_type: str, include_final_answer: bool) -> tuple[dict, ...]:
     # Determine which tools to include
-    allowed = universal_tools.copy()
+    allowed = _UNIVERSAL_TOOLS
 
     # Match file_type (case-insensitive prefix matching)
     file_type_upper = file_type.upper()
-    for fmt, tools in format_specific.items():
-        if file_type_upper.startswith(fmt.upper()):
-            allowed.update(tools)
+    for prefix, tools in _FORMAT_PREFIXES:
+        if file_type_upper.startswith(prefix):
+            allowed = allowed | tools
             break
 
     # Filter schemas
@@ -599,7 +620,24 @@ def get_tool_schemas_for_format(file_type: str, include_final_answer: bool = Tru
     if not include_final_answer:
         filtered = [s for s in filtered if s["name"] != "final_answer"]
 
-    return filtered
+    return tuple(filtered)
+
+
+def get_tool_schemas_for_format(file_type: str, include_final_answer: bool = True) -> list[dict]:
+    """
+    Return tool schemas appropriate for the given binary format.
+
+    The selection is computed once per (file_type, include_final_answer) and
+    cached; each call returns a fresh list so callers may modify it freely.
+
+    Args:
+        file_type: Binary format (e.g., "ELF64", "PE32", "Mach-O")
+        include_final_answer: Whether to include final_answer tool
+
+    Returns:
+        Filtered list of tool schemas
+    """
+    return list(_tool_schemas_for_format(file_type, include_final_answer))
 
 
 def schemas_to_openai(schemas: list[dict]) -> list[dict]:
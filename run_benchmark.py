@@ -102,11 +102,33 @@ def main():
         default=4096,
         help="Max tokens per LLM response (default: 4096)",
     )
+    parser.add_argument(
+        "--parallel-tasks",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Run up to N tasks concurrently (default: 1)",
+    )
     parser.add_argument(
         "--no-docker",
         action="store_true",
         help="Run tools via subprocess instead of Docker",
     )
+    parser.add_argument(
+        "--no-parallel-tools",
+        action="store_true",
+        help="Execute multiple tool calls from one model turn sequentially",
+    )
+    parser.add_argument(
+        "--no-tool-cache",
+        action="store_true",
+        help="Always re-run tools instead of reusing cached results from results/tool_cache/",
+    )
+    parser.add_argument(
+        "--reuse-results",
+        action="store_true",
+        help="Skip tasks already scored with the same binary, ground truth, model and settings",
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -151,7 +173,11 @@ def main():
         openai_custom_headers=custom_headers,
         max_tool_calls=args.max_tool_calls,
         max_tokens=args.max_tokens,
+        max_parallel_tasks=max(args.parallel_tasks, 1),
         use_docker=not args.no_docker,
+        enable_parallel_tool_execution=not args.no_parallel_tools,
+        enable_tool_cache=not args.no_tool_cache,
+        reuse_task_results=args.reuse_results,
         results_dir=Path(args.report) if args.report else None,
         verbose=args.verbose,
     )
@@ -17,10 +17,13 @@ Usage:
 """
 
 import argparse
+import functools
 import json
 import logging
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 logging.basicConfig(
@@ -60,6 +63,10 @@ BONUS_WEIGHTS = {
     "c2_protocol":             0.05,   # HTTP
 }
 
+# (field, weight) pairs for the weighted sums, in rubric order
+_STANDARD_WEIGHT_ITEMS = tuple(STANDARD_WEIGHTS.items())
+_BONUS_WEIGHT_ITEMS = tuple(BONUS_WEIGHTS.items())
+
 HALLUCINATION_PENALTY = 0.05   # per extra technique claim
 BONUS_HALLUCINATION_PENALTY = 0.03   # lighter per-claim (more techniques)
 
@@ -75,6 +82,11 @@ def normalize_c2(value):
     return str(value).strip().lower().rstrip("/")
 
 
+def _c2_host(norm):
+    """Host part of a normalised C2 value: drop scheme, then path and port."""
+    return norm.rpartition("://")[2].partition("/")[0].partition(":")[0]
+
+
 def score_decoded_c2(gt_val, agent_val):
     gt_norm = normalize_c2(gt_val)
     agent_norm = normalize_c2(agent_val)
@@ -87,9 +99,7 @@ def score_decoded_c2(gt_val, agent_val):
         return 0.0
 
     # Partial: host/IP matches but port/path differs
-    gt_host = gt_norm.split("://")[-1].split("/")[0].split(":")[0]
-    agent_host = agent_norm.split("://")[-1].split("/")[0].split(":")[0]
-    if gt_host == agent_host:
+    if _c2_host(gt_norm) == _c2_host(agent_norm):
         return 0.5
 
     return 0.0
@@ -97,24 +107,28 @@ def score_decoded_c2(gt_val, agent_val):
 
 def score_set_overlap(gt_items, agent_items):
     """Jaccard overlap.  Returns (credit, extra_count)."""
-    gt_set = set(gt_items or [])
-    agent_set = set(agent_items or [])
+    return _set_overlap(set(gt_items or []), set(agent_items or []))
+
+
+def _set_overlap(gt_set, agent_set):
+    """score_set_overlap() for callers that already hold both sets."""
     if not gt_set and not agent_set:
         return 1.0, 0
     if not gt_set:
         return 0.0, len(agent_set)
-    union = gt_set | agent_set
-    inter = gt_set & agent_set
-    extra = agent_set - gt_set
-    return (len(inter) / len(union) if union else 1.0), len(extra)
+    # |A ∪ B| and |B − A| follow from |A ∩ B|; no need to build those sets
+    inter = len(gt_set & agent_set)
+    union = len(gt_set) + len(agent_set) - inter
+    return inter / union, len(agent_set) - inter
 
 
 def score_exact(gt_val, agent_val):
-    if gt_val is None and agent_val is None:
+    # Exact matches (None/None included) need no normalising
+    if gt_val is agent_val or gt_val == agent_val:
         return 1.0
     if isinstance(gt_val, str) and isinstance(agent_val, str):
         return 1.0 if gt_val.strip().lower() == agent_val.strip().lower() else 0.0
-    return 1.0 if gt_val == agent_val else 0.0
+    return 0.0
 
 
 def score_fuzzy_string(gt_val, agent_val):
@@ -123,6 +137,9 @@ def score_fuzzy_string(gt_val, agent_val):
         return 1.0
     if gt_val is None or agent_val is None:
         return 0.0
+    # Only strings: 1 == 1.0 and True == 1, but their str() forms differ
+    if isinstance(gt_val, str) and gt_val == agent_val:
+        return 1.0
     g = str(gt_val).strip().lower()
     a = str(agent_val).strip().lower()
     if g == a:
@@ -134,7 +151,14 @@ def score_fuzzy_string(gt_val, agent_val):
 
 def is_bonus(ground_truth, gt_path=""):
     """Detect whether a sample is the level-13 bonus."""
+    # The path is only parsed when the ground truth doesn't name the sample
     name = ground_truth.get("sample", "") or Path(gt_path).stem
+    return _is_bonus_name(name)
+
+
+@functools.lru_cache(maxsize=256)
+def _is_bonus_name(name):
+    # A batch scores the same few sample names over and over
     return bool(BONUS_SAMPLE_PATTERN.search(name))
 
 
@@ -158,12 +182,10 @@ def score_standard(gt, agent):
     )
 
     # techniques
-    tech_credit, halluc_count = score_set_overlap(
-        gt.get("techniques"), agent.get("techniques"),
-    )
+    gt_t = set(gt.get("techniques") or [])
+    ag_t = set(agent.get("techniques") or [])
+    tech_credit, halluc_count = _set_overlap(gt_t, ag_t)
     result["field_scores"]["techniques"] = tech_credit
-    gt_t = set(gt.get("techniques", []))
-    ag_t = set(agent.get("techniques", []))
     result["hallucinated_techniques"] = sorted(ag_t - gt_t)
     result["missing_techniques"] = sorted(gt_t - ag_t)
 
@@ -183,10 +205,8 @@ def score_standard(gt, agent):
     )
 
     # Weighted sum
-    weighted = sum(
-        result["field_scores"].get(f, 0.0) * w
-        for f, w in STANDARD_WEIGHTS.items()
-    )
+    field_scores = result["field_scores"]
+    weighted = sum(field_scores[f] * w for f, w in _STANDARD_WEIGHT_ITEMS)
     result["weighted_score"] = round(weighted, 4)
 
     penalty = HALLUCINATION_PENALTY * halluc_count
@@ -225,20 +245,28 @@ def score_bonus(gt, agent):
         gt.get("decoded_c2"), agent.get("decoded_c2"),
     )
 
+    # The three encryption fields share one lookup per side
+    gt_enc = gt.get("encryption_details")
+    ag_enc = agent.get("encryption_details")
+    if not isinstance(gt_enc, dict):
+        gt_enc = {}
+    if not isinstance(ag_enc, dict):
+        ag_enc = {}
+
     # --- encryption_algorithm (0.10) ---
-    gt_algo = _get_nested(gt, "encryption_details", "algorithm", default="")
-    ag_algo = _get_nested(agent, "encryption_details", "algorithm", default="")
+    gt_algo = gt_enc.get("algorithm", "")
+    ag_algo = ag_enc.get("algorithm", "")
     result["field_scores"]["encryption_algorithm"] = score_exact(gt_algo, ag_algo)
 
     # --- encryption_key (0.15) ---
-    gt_key = _get_nested(gt, "encryption_details", "key", default="")
-    ag_key = _get_nested(agent, "encryption_details", "key", default="")
+    gt_key = gt_enc.get("key", "")
+    ag_key = ag_enc.get("key", "")
     result["field_scores"]["encryption_key"] = score_exact(gt_key, ag_key)
 
     # --- encryption_key_storage (0.05) ---
     #   Partial credit: agent mentions "xor" → 0.5, mentions "0xa5" → 0.5
-    gt_ks = str(_get_nested(gt, "encryption_details", "key_storage", default="")).lower()
-    ag_ks = str(_get_nested(agent, "encryption_details", "key_storage", default="")).lower()
+    gt_ks = str(gt_enc.get("key_storage", "")).lower()
+    ag_ks = str(ag_enc.get("key_storage", "")).lower()
     ks_score = 0.0
     if gt_ks and ag_ks:
         if "xor" in ag_ks:
@@ -250,12 +278,10 @@ def score_bonus(gt, agent):
     result["field_scores"]["encryption_key_storage"] = min(ks_score, 1.0)
 
     # --- techniques (0.15) ---
-    tech_credit, halluc_count = score_set_overlap(
-        gt.get("techniques"), agent.get("techniques"),
-    )
+    gt_t = set(gt.get("techniques") or [])
+    ag_t = set(agent.get("techniques") or [])
+    tech_credit, halluc_count = _set_overlap(gt_t, ag_t)
     result["field_scores"]["techniques"] = tech_credit
-    gt_t = set(gt.get("techniques", []))
-    ag_t = set(agent.get("techniques", []))
     result["hallucinated_techniques"] = sorted(ag_t - gt_t)
     result["missing_techniques"] = sorted(gt_t - ag_t)
 
@@ -295,10 +321,8 @@ def score_bonus(gt, agent):
     )
 
     # Weighted sum
-    weighted = sum(
-        result["field_scores"].get(f, 0.0) * w
-        for f, w in BONUS_WEIGHTS.items()
-    )
+    field_scores = result["field_scores"]
+    weighted = sum(field_scores[f] * w for f, w in _BONUS_WEIGHT_ITEMS)
     result["weighted_score"] = round(weighted, 4)
 
     penalty = BONUS_HALLUCINATION_PENALTY * halluc_count
@@ -321,19 +345,29 @@ def score_sample(gt, agent, gt_path=""):
 # I/O helpers
 # ===================================================================
 def load_json(path):
-    with open(path) as f:
-        return json.load(f)
+    # Bytes in: json detects the UTF encoding and skips the text-mode layer
+    return json.loads(Path(path).read_bytes())
 
 
 def score_single(gt_path, agent_path):
+    result = _score_files(gt_path, agent_path)
+    _log_result(result)
+    return result
+
+
+def _score_files(gt_path, agent_path):
     gt = load_json(gt_path)
     agent = load_json(agent_path)
 
-    sample_name = gt.get("sample", Path(gt_path).stem)
+    # Only fall back to the file name when the ground truth has none
+    sample_name = gt["sample"] if "sample" in gt else Path(gt_path).stem
     result = score_sample(gt, agent, gt_path)
     result["sample"] = sample_name
+    return result
+
 
-    log.info("Sample: %s [%s]", sample_name, result["tier"])
+def _log_result(result):
+    log.info("Sample: %s [%s]", result["sample"], result["tier"])
     for field, val in result["field_scores"].items():
         log.info("  %-28s %.4f", field, val)
     log.info("  Weighted score:            %.4f", result["weighted_score"])
@@ -345,10 +379,18 @@ def score_single(gt_path, agent_path):
     if result["missing_techniques"]:
         log.info("  Missing:      %s", result["missing_techniques"])
 
-    return result
 
+def _file_names(directory):
+    """Names of the regular files in directory (empty if it doesn't exist)."""
+    # One directory read instead of a stat per sample
+    try:
+        with os.scandir(directory) as entries:
+            return {e.name for e in entries if e.is_file()}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
 
-def score_batch(gt_dir, agent_dir):
+
+def score_batch(gt_dir, agent_dir, jobs=1):
     gt_dir = Path(gt_dir)
     agent_dir = Path(agent_dir)
 
@@ -359,12 +401,29 @@ def score_batch(gt_dir, agent_dir):
         log.error("No ground truth JSON files found in %s", gt_dir)
         return results
 
-    for gt_file in gt_files:
-        agent_file = agent_dir / gt_file.name
-        if not agent_file.exists():
-            log.warning("No agent output for %s, skipping", gt_file.name)
-            continue
-        results.append(score_single(str(gt_file), str(agent_file)))
+    agent_names = _file_names(agent_dir)
+
+    if jobs <= 1:
+        for gt_file in gt_files:
+            if gt_file.name not in agent_names:
+                log.warning("No agent output for %s, skipping", gt_file.name)
+                continue
+            agent_file = agent_dir / gt_file.name
+            results.append(score_single(gt_file, agent_file))
+        return results
+
+    found = [(g, agent_dir / g.name) for g in gt_files if g.name in agent_names]
+
+    # Workers only load and score; logging stays here, in file order
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        scored = pool.map(_score_files, *zip(*found), chunksize=8) if found else iter(())
+        for gt_file in gt_files:
+            if gt_file.name not in agent_names:
+                log.warning("No agent output for %s, skipping", gt_file.name)
+                continue
+            result = next(scored)
+            _log_result(result)
+            results.append(result)
 
     return results
 
@@ -472,6 +531,12 @@ def main():
         "--report", "-r",
         help="Write JSON report to this path",
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Score batch files in this many worker processes (default: 1)",
+    )
 
     args = parser.parse_args()
 
@@ -479,7 +544,7 @@ def main():
         result = score_single(args.ground_truth, args.agent_output)
         results = [result]
     elif args.ground_truth_dir and args.agent_output_dir:
-        results = score_batch(args.ground_truth_dir, args.agent_output_dir)
+        results = score_batch(args.ground_truth_dir, args.agent_output_dir, jobs=args.jobs)
     else:
         parser.error(
             "Provide either --ground-truth + --agent-output "
@@ -514,8 +579,9 @@ def main():
                 "hallucination_penalty_bonus": BONUS_HALLUCINATION_PENALTY,
             },
         }
+        # One write of the whole document; json.dump writes piece by piece
         with open(args.report, "w") as f:
-            json.dump(report, f, indent=2)
+            f.write(json.dumps(report, indent=2))
         log.info("Report written to %s", args.report)
 
 